@@ -29,8 +29,10 @@ export interface CopilotDashboardData {
   rollingWindow: number
   minTicketsThreshold: number
   bucketing?: {
-    sizeCut: number
-    filesCut: number
+    sizeCut: number | null
+    filesCut: number | null
+    sizeCuts?: number[]
+    filesCuts?: number[]
     sizeLabels: string[]
     filesLabels: string[]
   }
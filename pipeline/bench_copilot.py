@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""
+Copilot Adoption Dashboard - Pipeline Benchmarks
+
+Times refresh_copilot.py stages on synthetic PR and telemetry histories, so scaling can be
+checked without the real client exports (which can't be shared).
+
+Usage:
+    python pipeline/bench_copilot.py weekly
+    python pipeline/bench_copilot.py weekly --years 1 2 4 --teams 1 4 16
+    python pipeline/bench_copilot.py tickets [--years 1 2 --teams 1 4]
+    python pipeline/bench_copilot.py check
+    python pipeline/bench_copilot.py xlsx [--input path/to/export.xlsx]
+    python pipeline/bench_copilot.py payload [--years 2 --teams 16]
+    python pipeline/bench_copilot.py suite [--rows 10000 100000 1000000 10000000] [--compare old.json]
+"""
+
+import argparse
+import contextlib
+import inspect
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import refresh_copilot as rc
+
+SEED = 20260805
+HISTORY_START = '2025-07-01'
+AUTHORS_PER_TEAM = 30
+TICKETS_PER_AUTHOR_WEEK = 1.2
+BENCH_DIR = rc.OUTPUT_DIR / 'bench'
+BENCH_DIR_REL = BENCH_DIR.relative_to(rc.PROJECT_ROOT)
+
+
+DEPARTMENTS = np.array(['Development', 'Development', 'Development', 'SQA', 'Management'], dtype=object)
+# Share of a developer's rows tagged with some other department, so the
+# modal-department logic has something to resolve.
+DEPARTMENT_NOISE = 0.03
+PRS_PER_TEAM_YEAR = 3000
+ADOPTERS = 0.85
+ACTIVE_DAY_RATE = 0.6
+
+
+def _authors(n_authors, rng):
+    """(AuthorUUID, Email, home Department) arrays indexed by author number."""
+    uuids = np.array([f'author-{a:06d}' for a in range(n_authors)], dtype=object)
+    emails = np.array([f'dev{a:06d}@example.com' for a in range(n_authors)], dtype=object)
+    return uuids, emails, DEPARTMENTS[rng.integers(0, len(DEPARTMENTS), n_authors)]
+
+
+def _departments(home, rng):
+    noisy = rng.random(len(home)) < DEPARTMENT_NOISE
+    return np.where(noisy, DEPARTMENTS[rng.integers(0, len(DEPARTMENTS), len(home))], home)
+
+
+def synth_prs(years=1, teams=1, seed=SEED):
+    """Synthetic PR rows shaped like the 'Pull Requests' sheet.
+
+    Each team has its own author pool and Jira project key; every author
+    ships ~TICKETS_PER_AUTHOR_WEEK tickets a week, some tickets with several
+    PRs and a second co-author. About PRS_PER_TEAM_YEAR rows per team-year.
+    Deterministic for a given seed.
+    """
+    rng = np.random.default_rng(seed)
+    n_weeks = int(round(years * 52))
+    n_authors = AUTHORS_PER_TEAM * teams
+    n_tickets = int(n_authors * n_weeks * TICKETS_PER_AUTHOR_WEEK)
+
+    team = rng.integers(0, teams, n_tickets)
+    author = team * AUTHORS_PER_TEAM + rng.integers(0, AUTHORS_PER_TEAM, n_tickets)
+    day = rng.integers(0, n_weeks * 7, n_tickets)
+    prs_per_ticket = rng.choice([1, 1, 1, 2, 3], n_tickets)
+
+    idx = np.repeat(np.arange(n_tickets), prs_per_ticket)
+    n = len(idx)
+    # ~15% of follow-up PRs come from a teammate rather than the ticket owner.
+    co_author = team[idx] * AUTHORS_PER_TEAM + rng.integers(0, AUTHORS_PER_TEAM, n)
+    first_pr = np.r_[True, idx[1:] != idx[:-1]]
+    pr_author = np.where(~first_pr & (rng.random(n) < 0.15), co_author, author[idx])
+
+    start = pd.Timestamp(HISTORY_START)
+    pr_end = start + pd.to_timedelta(day[idx] + rng.integers(0, 3, n), unit='D') \
+        + pd.to_timedelta(rng.integers(0, 86400, n), unit='s')
+    pr_start = pr_end - pd.to_timedelta(rng.integers(3600, 4 * 86400, n), unit='s')
+    qa_lines = np.where(rng.random(n) < 0.2, rng.integers(1, 200, n), 0)
+    uuids, emails, home = _authors(n_authors, rng)
+    tickets = np.array([f'T{t:02d}-{i}' for i, t in enumerate(team)], dtype=object)
+    return pd.DataFrame({
+        'JiraTicket': tickets[idx],
+        'AuthorUUID': uuids[pr_author],
+        'FirstActivity': pr_end - pd.to_timedelta(rng.integers(1, 10, n), unit='D'),
+        'FirstReadyForQADate': pr_end,
+        'PRStart': pr_start,
+        'PREnd': pr_end,
+        'PRFiles': rng.integers(1, 20, n),
+        'PRLines': rng.lognormal(4, 1.3, n).astype(int) + 1,
+        'ChurnLines': rng.integers(0, 50, n),
+        'QAChurnLines': qa_lines,
+        'Department': _departments(home[pr_author], rng),
+        'Email': emails[pr_author],
+    })
+
+
+def synth_telemetry(years=1, teams=1, seed=SEED):
+    """Synthetic daily telemetry rows shaped like the 'AI All' sheet (new format).
+
+    Same author pool as synth_prs(years, teams, seed). ADOPTERS of them pick
+    the tool up at some point between BASELINE_END and MATURE_START and are
+    then active on ~ACTIVE_DAY_RATE of workdays — about as many rows as
+    synth_prs produces.
+    """
+    rng = np.random.default_rng(seed + 1)
+    n_days = int(round(years * 52)) * 7
+    n_authors = AUTHORS_PER_TEAM * teams
+    start = pd.Timestamp(HISTORY_START)
+    rollout = (pd.Timestamp(rc.BASELINE_END) - start).days
+    mature = (pd.Timestamp(rc.MATURE_START) - start).days
+    adopt_day = np.where(rng.random(n_authors) < ADOPTERS,
+                         rng.integers(rollout, mature, n_authors), n_days)
+    workday = ((start.dayofweek + np.arange(n_days)) % 7) < 5
+
+    authors, days = [], []
+    for lo in range(0, n_authors, 10_000):
+        block = np.arange(lo, min(lo + 10_000, n_authors))
+        active = (rng.random((len(block), n_days)) < ACTIVE_DAY_RATE) & workday \
+            & (np.arange(n_days) >= adopt_day[block, None])
+        a, d = np.nonzero(active)
+        authors.append(block[a])
+        days.append(d)
+    author = np.concatenate(authors)
+    n = len(author)
+    suggested = rng.poisson(12, n)
+    accepted = rng.binomial(suggested, 0.3)
+    uuids, emails, home = _authors(n_authors, np.random.default_rng(seed))
+    return pd.DataFrame({
+        'AuthorUUID': uuids[author],
+        'Email': emails[author],
+        'EventDay': start + pd.to_timedelta(np.concatenate(days), unit='D'),
+        'suggestionCount': suggested,
+        'acceptedSuggestionCount': accepted,
+        'SuggestedLineCountAdd': suggested * rng.integers(1, 30, n),
+        'SuggestedLineCountDelete': rng.integers(0, 20, n),
+        'LineCountAdded': accepted * rng.integers(1, 20, n),
+        'LineCountDeleted': rng.integers(0, 10, n),
+        'Department': _departments(home[author], rng),
+        'UsedAgent': (rng.random(n) < 0.1).astype(int),
+        'UsedChat': (rng.random(n) < 0.3).astype(int),
+    })
+
+
+def synth_dataset(rows, seed=SEED):
+    """(prs, telemetry) with about ``rows`` PR rows over one year, however many teams that takes."""
+    teams = max(1, round(rows / PRS_PER_TEAM_YEAR))
+    return synth_prs(1, teams, seed), synth_telemetry(1, teams, seed)
+
+
+def _with_author_strings(tickets, ticket_authors):
+    """Re-attach the legacy comma-joined AuthorUUIDs column for the scan reference."""
+    joined = ticket_authors.groupby('JiraTicket')['AuthorUUID'].agg(','.join)
+    return tickets.assign(AuthorUUIDs=tickets['JiraTicket'].map(joined))
+
+
+def _weekly_team_metrics_scan(tickets):
+    """Per-week boolean-scan reference (the pre-grouped implementation)."""
+    rows = []
+    for week in pd.DatetimeIndex(tickets['WeekEnding'].dropna().unique()).sort_values():
+        wk = tickets[tickets['WeekEnding'] == week]
+        authors = set()
+        for uuids_str in wk['AuthorUUIDs']:
+            authors.update(str(uuids_str).split(','))
+        n = len(wk)
+        team_authors = max(len(authors), 1)
+        rows.append({
+            'WeekEnding': week,
+            'TotalTickets': n,
+            'TeamAuthors': team_authors,
+            'TeamProductivity': n / (team_authors * rc.WORKDAYS_PER_WEEK),
+            'TeamQAChurnRate': wk['HasQAChurn'].sum() / n,
+            'TotalPRs': int(wk['PRCount'].sum()),
+            'TotalLines': int(wk['TotalLines'].sum()),
+            'LowConfidence': n < rc.MIN_TICKETS_THRESHOLD,
+        })
+    return pd.DataFrame(rows)
+
+
+def _aggregate_to_tickets_apply(prs):
+    """Per-ticket groupby().apply reference (the pre-named-aggregation implementation)."""
+    def agg_ticket(g):
+        return pd.Series({
+            'PRCount': len(g),
+            'FirstActivity': g['FirstActivity'].min(),
+            'PREnd': g['PREnd'].max(),
+            'AuthorUUIDs': ','.join(g['AuthorUUID'].unique().astype(str)),
+            'MaxFiles': g['PRFiles'].max(),
+            'TotalLines': g['PRLines'].sum(),
+            'TotalChurnLines': g['ChurnLines'].sum(),
+            'TotalQAChurnLines': g['QAChurnLines'].sum(),
+        })
+
+    return prs.groupby('JiraTicket').apply(agg_ticket).reset_index()
+
+
+def _copilot_tickets_apply(prs, copilot_df):
+    """Per-ticket groupby().apply reference for compute_copilot_pr_correlation's ticket rollup.
+
+    The pre-fact-table implementation: PR rows merged with the author-week
+    telemetry, then one pd.Series per ticket.
+    """
+    prs = prs.reset_index(drop=True)
+    prs['PREnd'] = pd.to_datetime(prs['PREnd']).dt.normalize()
+    prs['WeekEnding'] = prs['PREnd'].dt.to_period('W-SUN').dt.end_time.dt.normalize()
+    copilot_weekly = copilot_df.groupby(['user_id', 'week']).agg(
+        suggestions=('suggestions', 'sum'),
+        acceptances=('acceptances', 'sum'),
+    ).reset_index()
+    merged = prs.merge(copilot_weekly, left_on=['AuthorUUID', 'WeekEnding'], right_on=['user_id', 'week'],
+                       how='left', suffixes=('', '_copilot'))
+    prs['copilot_suggestions'] = merged['suggestions'].fillna(0)
+    prs['copilot_acceptances'] = merged['acceptances'].fillna(0)
+    prs['copilot_assisted'] = (prs['copilot_suggestions'] > 0).astype(int)
+
+    def agg_ticket(g):
+        return pd.Series({
+            'PREnd': g['PREnd'].max(),
+            'AuthorUUIDs': ','.join(g['AuthorUUID'].unique().astype(str)),
+            'TotalLines': g['PRLines'].sum(),
+            'MaxFiles': g['PRFiles'].max(),
+            'TotalQAChurnLines': g['QAChurnLines'].sum() if 'QAChurnLines' in g.columns else 0,
+            'CopilotAssisted': int(g['copilot_assisted'].any()),
+            'TotalSuggestions': g['copilot_suggestions'].sum(),
+            'TotalAcceptances': g['copilot_acceptances'].sum(),
+        })
+
+    return prs.groupby('JiraTicket').apply(agg_ticket).reset_index()
+
+
+def _copilot_tickets(prs, copilot_df):
+    """The correlation's ticket rollup as the dashboard builds it: fact table, telemetry join, ticket view."""
+    prs, copilot_df = rc.encode_keys(prs, copilot_df)
+    return rc.ticket_view(rc.join_copilot(rc.build_fact_table(prs), copilot_df))
+
+
+def _time(fn, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def bench_weekly(years_list, teams_list):
+    print(f"{'years':>5} {'teams':>5} {'weeks':>6} {'tickets':>9} {'scan s':>8} {'grouped s':>10} {'speedup':>8}")
+    for years in years_list:
+        for teams in teams_list:
+            tickets, ticket_authors = rc.aggregate_to_tickets(synth_prs(years, teams))
+            legacy = _with_author_strings(tickets, ticket_authors)
+            scan_s, expected = _time(_weekly_team_metrics_scan, legacy, repeat=1)
+            grouped_s, weekly = _time(rc.compute_weekly_team_metrics, tickets, ticket_authors)
+            pd.testing.assert_frame_equal(weekly, expected, check_dtype=False)
+            print(f"{years:>5} {teams:>5} {len(weekly):>6} {len(tickets):>9} "
+                  f"{scan_s:>8.3f} {grouped_s:>10.3f} {scan_s / grouped_s:>7.1f}x")
+
+
+def bench_tickets(years_list, teams_list):
+    print(f"{'years':>5} {'teams':>5} {'PRs':>9} {'tickets':>9} {'apply s':>8} {'named s':>8} {'speedup':>8}")
+    for years in years_list:
+        for teams in teams_list:
+            prs = synth_prs(years, teams)
+            apply_s, expected = _time(_aggregate_to_tickets_apply, prs, repeat=1)
+            named_s, (tickets, ticket_authors) = _time(rc.aggregate_to_tickets, prs)
+            actual = _with_author_strings(tickets, ticket_authors)[expected.columns]
+            pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+            print(f"{years:>5} {teams:>5} {len(prs):>9} {len(tickets):>9} "
+                  f"{apply_s:>8.3f} {named_s:>8.3f} {apply_s / named_s:>7.1f}x")
+
+    # The second call site: the Copilot-PR correlation's rollup, which adds
+    # the author-week telemetry (CopilotAssisted, TotalSuggestions, ...).
+    print(f"\ncopilot-pr correlation tickets")
+    print(f"{'years':>5} {'teams':>5} {'PRs':>9} {'tickets':>9} {'apply s':>8} {'named s':>8} {'speedup':>8}")
+    for years in years_list:
+        for teams in teams_list:
+            prs = synth_prs(years, teams)
+            copilot = rc.prepare_copilot_df(synth_telemetry(years, teams), 'new')
+            apply_s, expected = _time(_copilot_tickets_apply, prs, copilot, repeat=1)
+            named_s, (tickets, ticket_authors) = _time(_copilot_tickets, prs, copilot)
+            actual = _with_author_strings(tickets, ticket_authors).assign(
+                JiraTicket=tickets['JiraTicket'].astype(str), PREnd=tickets['PREndDate'])[expected.columns]
+            pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+            print(f"{years:>5} {teams:>5} {len(prs):>9} {len(tickets):>9} "
+                  f"{apply_s:>8.3f} {named_s:>8.3f} {apply_s / named_s:>7.1f}x")
+
+
+def check_numeric_user_ids():
+    """Legacy Copilot_All telemetry keyed by a numeric GithubUserId gets real per-user active days.
+
+    Before the per-user panel, user_days was looked up with the numeric ids
+    while users were keyed by their string form, so every legacy developer
+    came out with activeDays 0 and intensityTier 'none'.
+    """
+    prs, telemetry = synth_dataset(3_000)
+    numeric = telemetry['AuthorUUID'].str.rsplit('-', n=1).str[1].astype(int)
+    legacy = pd.DataFrame({
+        'GithubUserId': numeric,
+        'EventDay': telemetry['EventDay'],
+        'CodeGenerationActivityCount': telemetry['suggestionCount'],
+        'CodeAcceptanceActivityCount': telemetry['acceptedSuggestionCount'],
+        'LocAddedSum': telemetry['LineCountAdded'],
+        'LocDeletedSum': telemetry['LineCountDeleted'],
+    })
+    copilot = rc.prepare_copilot_df(legacy, 'legacy')
+    expected = copilot.groupby(copilot['user_id'].astype(str))['EventDay'].nunique()
+    data = rc.build_dashboard_payload(prs, copilot, 'legacy')
+    checked = 0
+    for user in data['perUser']:
+        if user['uuid'] in expected.index:
+            days = int(expected[user['uuid']])
+            assert user['summary']['activeDays'] == days, (user['uuid'], user['summary']['activeDays'], days)
+            assert user['summary']['intensityTier'] != 'none'
+            checked += 1
+    assert checked == len(expected), (checked, len(expected))
+    print(f"numeric user ids: activeDays of {checked} legacy telemetry users match the telemetry")
+
+
+def check_section_keys():
+    """Editing a called method (.mean() to .median() in compute_baseline) changes the section keys.
+
+    The two calls compile to the same bytecode and differ only in the names
+    the code looks up, so a digest of co_code alone served the stale
+    baseline from the section cache.
+    """
+    stages = rc.dashboard_stages(None)
+    sources = {'load_prs': 'synthetic', 'load_copilot': None, 'load_state': None}
+    source = inspect.getsource(rc.compute_baseline)
+    edited = source.replace("['TeamProductivity'].mean()", "['TeamProductivity'].median()")
+    assert edited != source
+    original = rc.compute_baseline
+    keys = []
+    try:
+        # Both versions compiled the same way, so only the edit tells them apart.
+        for text in (source, edited):
+            exec(text, vars(rc))
+            keys.append(rc.section_keys(stages, sources))
+    finally:
+        rc.compute_baseline = original
+    before, after = keys
+    changed = sorted(name for name in before if before[name] != after[name])
+    assert 'compute_baseline' in changed and 'assemble_payload' in changed, changed
+    assert 'compute_weekly_team_metrics' not in changed, changed
+    print(f"section keys: .mean() -> .median() in compute_baseline changes {len(changed)} of {len(before)} keys")
+
+
+def _traced(fn, *args):
+    """(seconds, peak traced bytes, result): one timed call, one traced call.
+
+    The timing run is untraced — tracemalloc slows allocation-heavy code
+    several-fold and would distort the comparison.
+    """
+    t0 = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    out = fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, out
+
+
+def bench_xlsx(path):
+    """Full read_excel vs the column-projected streaming reader, per sheet."""
+    names = rc.sheet_names(path)
+    sheets = [(rc.find_pull_sheet(names), rc.PR_COLUMNS)]
+    copilot = rc.find_copilot_sheet(names)
+    if copilot:
+        sheet, fmt = copilot
+        sheets.append((sheet, set(rc.COPILOT_RENAMES[fmt]) | set(rc.COPILOT_COLUMNS)))
+    mb = 1024 ** 2
+    print(f"{path}")
+    print(f"{'sheet':<16} {'mode':<10} {'cols':>5} {'parse s':>8} {'peak MB':>8} {'frame MB':>9}")
+    for sheet, columns in sheets:
+        for mode, projection in (('full', None), ('projected', sorted(columns))):
+            secs, peak, df = _traced(rc._parse_sheet, path, sheet, projection)
+            frame = df.memory_usage(deep=True).sum()
+            print(f"{sheet:<16} {mode:<10} {df.shape[1]:>5} {secs:>8.2f} {peak / mb:>8.1f} {frame / mb:>9.2f}")
+            if projection is None:
+                full = df
+        pd.testing.assert_frame_equal(df, full[df.columns])
+
+
+def synth_payload(years=2, teams=16):
+    """A build_dashboard_data payload for a synthetic team (CSV path, no telemetry).
+
+    The defaults (480 developers, two years) give an ~11 MB payload, about the
+    size of the largest client's.
+    """
+    prs = synth_prs(years, teams)
+    with tempfile.TemporaryDirectory() as tmp, _scratch_caches(tmp):
+        csv = f'{tmp}/prs.csv'
+        prs.assign(FirstReadyForQADate=prs['PREnd'], PRStart=prs['FirstActivity']).to_csv(csv, index=False)
+        data = rc.build_dashboard_data(csv)
+    data.pop('_userIdMap', None)
+    return data
+
+
+@contextlib.contextmanager
+def _scratch_caches(tmp):
+    """Sheet and section caches off, workbook index under ``tmp``.
+
+    A bench must neither write into pipeline/output nor time a cache hit.
+    """
+    saved = rc.XLSX_CACHE_DIR, rc.SECTION_CACHE_DIR, rc.WORKBOOK_INDEX, rc._WORKBOOK_INDEX
+    rc.XLSX_CACHE_DIR = rc.SECTION_CACHE_DIR = rc._WORKBOOK_INDEX = None
+    rc.WORKBOOK_INDEX = rc.Path(tmp) / 'workbook-index.json'
+    try:
+        yield
+    finally:
+        rc.XLSX_CACHE_DIR, rc.SECTION_CACHE_DIR, rc.WORKBOOK_INDEX, rc._WORKBOOK_INDEX = saved
+
+
+def _write_payload_two_pass(data, path):
+    """The pre-streaming write: sanitized copy, json.dumps, regex no-op guard on both texts."""
+    json_str = json.dumps(rc._sanitize_for_json(data), default=rc.serialize, indent=2)
+    if path.exists() and rc.strip_generated(path.read_text(encoding='utf-8')) == rc.strip_generated(json_str):
+        return False
+    path.write_text(json_str, encoding='utf-8')
+    return True
+
+
+def bench_payload(years, teams):
+    """Two-pass json.dumps write vs the streaming encoder, on a fresh and an unchanged output."""
+    data = synth_payload(years, teams)
+    mb = 1024 ** 2
+    print(f"{len(data['perUser'])} developers, {years} years")
+    print(f"{'writer':<12} {'output':<10} {'MB':>6} {'write s':>8} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        outputs = {}
+        for name, write in (('two-pass', _write_payload_two_pass), ('streaming', rc.write_dashboard_json)):
+            path = rc.Path(tmp) / f'{name}.json'
+            for state in ('fresh', 'unchanged'):
+                def run():
+                    # _traced calls twice; the second call of a fresh write must also start fresh.
+                    if state == 'fresh':
+                        path.unlink(missing_ok=True)
+                    return write(data, path)
+
+                secs, peak, written = _traced(run)
+                assert written == (state == 'fresh')
+                print(f"{name:<12} {state:<10} {path.stat().st_size / mb:>6.1f} {secs:>8.2f} {peak / mb:>8.1f}")
+            outputs[name] = path.read_bytes()
+        assert outputs['two-pass'] == outputs['streaming']
+
+
+def _rows(result):
+    """Output row count of a stage result (first frame of a tuple; list length)."""
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, (pd.DataFrame, list)):
+        return len(result)
+    return None
+
+
+# (stage, input frame names, call). Each call reads earlier outputs from ctx;
+# its result is stored under the stage name.
+SUITE_STAGES = [
+    ('prepare_copilot_df', ('telemetry',), lambda c: rc.prepare_copilot_df(c['telemetry'], 'new')),
+    ('encode_keys', ('prs', 'copilot'), lambda c: rc.encode_keys(c['prs'], c['prepare_copilot_df'])),
+    ('week_calendar', ('prs', 'copilot'),
+     lambda c: rc.week_calendar(c['prs']['PREnd'], c['prepare_copilot_df']['EventDay'])),
+    ('build_fact_table', ('prs', 'copilot'),
+     lambda c: rc.build_fact_table(c['encode_keys'][0], c['encode_keys'][1])),
+    ('ticket_view', ('facts',), lambda c: rc.ticket_view(c['build_fact_table'])),
+    ('compute_weekly_team_metrics', ('tickets',),
+     lambda c: rc.compute_weekly_team_metrics(*c['ticket_view'])),
+    ('size_buckets', ('tickets',), lambda c: rc.size_buckets(*c['ticket_view'])),
+    ('build_size_complexity_cube', ('tickets',),
+     lambda c: rc.build_size_complexity_cube(*c['size_buckets'], c['week_calendar'])),
+    ('compute_baseline', ('tickets',),
+     lambda c: rc.compute_baseline(*c['ticket_view'], c['compute_weekly_team_metrics'])),
+    ('compute_team_summary', ('tickets',),
+     lambda c: rc.compute_team_summary(*c['ticket_view'], c['compute_weekly_team_metrics'],
+                                       c['compute_baseline'])),
+    ('compute_size_complexity_weekly', ('sc_cube',),
+     lambda c: rc.compute_size_complexity_weekly(c['build_size_complexity_cube'])),
+    ('compute_size_complexity', ('tickets',),
+     lambda c: rc.compute_size_complexity(c['size_buckets'][0], c['build_size_complexity_cube'])),
+    ('compute_project_metrics', ('tickets',),
+     lambda c: rc.compute_project_metrics(c['ticket_view'][0], c['week_calendar'])),
+    ('resolve_identities', ('facts', 'copilot'),
+     lambda c: rc.resolve_identities(c['build_fact_table'], c['encode_keys'][1])),
+    ('compute_copilot_adoption', ('copilot',),
+     lambda c: rc.compute_copilot_adoption(c['encode_keys'][1], c['resolve_identities'])),
+    ('compute_copilot_pr_correlation', ('tickets',),
+     lambda c: rc.compute_copilot_pr_correlation(*c['ticket_view'])),
+    ('compute_per_user_metrics', ('facts', 'copilot'),
+     lambda c: rc.compute_per_user_metrics(c['build_fact_table'], c['encode_keys'][1], c['resolve_identities'],
+                                           c['week_calendar'])),
+    ('build_dashboard_payload', ('prs', 'copilot'),
+     lambda c: rc.build_dashboard_payload(c['prs'], c['prepare_copilot_df'], 'new')),
+    ('write_dashboard_json', ('payload',),
+     lambda c: rc.write_dashboard_json(c['build_dashboard_payload'], c['tmp'] / 'payload.json')),
+]
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=rc.PIPELINE_DIR,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_suite(rows_list, memory=True, seed=SEED):
+    """Time (and trace) every SUITE_STAGES stage on synth_dataset(rows) for each size."""
+    mb = 1024 ** 2
+    runs = []
+    for rows in rows_list:
+        t0 = time.perf_counter()
+        prs, telemetry = synth_dataset(rows, seed)
+        gen_s = time.perf_counter() - t0
+        print(f"\n{len(prs):,} PR rows, {len(telemetry):,} telemetry rows, "
+              f"{prs['AuthorUUID'].nunique():,} authors (generated in {gen_s:.1f}s)")
+        print(f"{'stage':<32} {'in rows':>11} {'out rows':>9} {'s':>8} {'peak MB':>8}")
+        ctx = {'prs': prs, 'telemetry': telemetry}
+        sizes = {'prs': len(prs), 'telemetry': len(telemetry)}
+        stages = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            ctx['tmp'] = rc.Path(tmp)
+            for name, inputs, call in SUITE_STAGES:
+                if memory:
+                    secs, peak, out = _traced(call, ctx)
+                else:
+                    secs, out = _time(call, ctx, repeat=1)
+                    peak = None
+                ctx[name] = out
+                rows_in = sum(sizes.get(i) or 0 for i in inputs)
+                rows_out = _rows(out)
+                sizes.update({'facts': len(ctx.get('build_fact_table', ())),
+                              'tickets': len(ctx.get('ticket_view', ((),))[0]),
+                              'copilot': len(ctx.get('prepare_copilot_df', ())),
+                              'sc_cube': len(ctx.get('build_size_complexity_cube', ()))})
+                if name == 'build_dashboard_payload':
+                    out.pop('_userIdMap', None)
+                    sizes['payload'] = len(out['perUser'])
+                stages[name] = {'seconds': round(secs, 4), 'peakMB': None if peak is None else round(peak / mb, 2),
+                                'rowsIn': rows_in, 'rowsOut': rows_out}
+                print(f"{name:<32} {rows_in:>11,} {rows_out if rows_out is not None else '':>9} {secs:>8.3f} "
+                      f"{'' if peak is None else f'{peak / mb:8.1f}':>8}")
+        runs.append({'rows': rows, 'prRows': len(prs), 'telemetryRows': len(telemetry),
+                     'authors': int(prs['AuthorUUID'].nunique()), 'stages': stages})
+    return {
+        'commit': _git_commit(),
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'seed': seed,
+        'memory': memory,
+        'runs': runs,
+    }
+
+
+def compare_suite(current, previous, threshold=1.25, min_delta=0.05):
+    """Print per-stage time ratios against an earlier suite result.
+
+    A stage is flagged when it is both ``threshold`` times and ``min_delta``
+    seconds slower, so millisecond stages don't trip on timer noise.
+    """
+    prev = {(r['rows'], name): st for r in previous['runs'] for name, st in r['stages'].items()}
+    print(f"\nvs {previous.get('commit')} ({previous.get('timestamp')}):")
+    slower = 0
+    for run in current['runs']:
+        for name, st in run['stages'].items():
+            old = prev.get((run['rows'], name))
+            if not old or not old['seconds']:
+                continue
+            ratio = st['seconds'] / old['seconds']
+            flag = '  REGRESSION' if ratio > threshold and st['seconds'] - old['seconds'] > min_delta else ''
+            slower += bool(flag)
+            print(f"  {run['rows']:>10,} {name:<32} {old['seconds']:>8.3f} -> {st['seconds']:>8.3f}s "
+                  f"({ratio:.2f}x){flag}")
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark refresh_copilot.py stages on synthetic data')
+    sub = parser.add_subparsers(dest='bench', required=True)
+    weekly = sub.add_parser('weekly', help='compute_weekly_team_metrics vs per-week scans')
+    weekly.add_argument('--years', type=float, nargs='+', default=[1, 2, 4])
+    weekly.add_argument('--teams', type=int, nargs='+', default=[1, 4, 16])
+    tickets = sub.add_parser('tickets', help='both ticket rollups (PR side, Copilot-PR correlation) vs per-ticket groupby().apply')
+    tickets.add_argument('--years', type=float, nargs='+', default=[1, 2])
+    tickets.add_argument('--teams', type=int, nargs='+', default=[1, 4])
+    sub.add_parser('check', help='correctness checks on synthetic data (no timings)')
+    xlsx = sub.add_parser('xlsx', help='full vs column-projected workbook parsing')
+    xlsx.add_argument('--input', '-i', type=str, help='Workbook to parse (default: latest export)')
+    payload = sub.add_parser('payload', help='two-pass vs streaming dashboard JSON write')
+    payload.add_argument('--years', type=float, default=2)
+    payload.add_argument('--teams', type=int, default=16)
+    suite = sub.add_parser('suite', help='every compute_* stage + end to end, saved as JSON')
+    suite.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                       help='Approximate PR rows per run (10k .. 10M)')
+    suite.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc run of each stage')
+    suite.add_argument('--output', '-o', type=rc.Path, help=f'Result JSON (default: {BENCH_DIR_REL}/suite-<commit>-<time>.json)')
+    suite.add_argument('--compare', type=rc.Path, help='Earlier suite JSON to compare stage times against')
+    args = parser.parse_args()
+
+    if args.bench == 'weekly':
+        bench_weekly(args.years, args.teams)
+    elif args.bench == 'tickets':
+        bench_tickets(args.years, args.teams)
+    elif args.bench == 'check':
+        check_numeric_user_ids()
+        check_section_keys()
+    elif args.bench == 'xlsx':
+        bench_xlsx(args.input or rc.find_latest_xlsx())
+    elif args.bench == 'payload':
+        bench_payload(args.years, args.teams)
+    elif args.bench == 'suite':
+        result = bench_suite(args.rows, memory=not args.no_memory)
+        out = args.output or BENCH_DIR / f"suite-{result['commit'] or 'nogit'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(result, indent=2), encoding='utf-8')
+        print(f"\nResults written to: {out}")
+        if args.compare and compare_suite(result, json.loads(args.compare.read_text(encoding='utf-8'))):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
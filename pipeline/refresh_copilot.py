@@ -11,10 +11,20 @@ Usage:
 """
 
 import argparse
+import contextlib
+import functools
+import gzip
+import hashlib
+import io
 import json
+import multiprocessing
 import os
 import re
 import sys
+import time
+import tracemalloc
+import types
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from datetime import datetime, date
 from pathlib import Path
 
@@ -27,6 +37,18 @@ except ImportError:
     np = None
     HAS_PANDAS = False
 
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, the report just omits RSS
+    resource = None
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    brotli = None
+    HAS_BROTLI = False
+
 # ── CONFIG ──────────────────────────────────────────────────────────────────
 # Three-phase model:
 #   Phase 1: Pre-Oct baseline — no AI tools (Jul 2 – Sep 30)
@@ -36,7 +58,15 @@ BASELINE_END = '2025-10-01'       # End of pre-AI baseline period
 MATURE_START = '2026-02-07'       # Start of 80%+ Copilot adoption
 WORKDAYS_PER_WEEK = 5
 ROLLING_WINDOW = 4
+# Weeks of telemetry in the rolling-active denominator of copilotPct /
+# devCopilotPct (see compute_copilot_adoption). 8 or 13 smooth out holiday
+# dips at the cost of lagging real churn.
+ADOPTION_WINDOW = 4
 MIN_TICKETS_THRESHOLD = 5
+# Copilot intensity of a ticket by its total suggestions (see
+# compute_copilot_pr_correlation): 0 is 'none', ≤ 10 'low', ≤ 50 'medium'.
+INTENSITY_CUTS = [0, 10, 50]
+INTENSITY_LABELS = ['none', 'low', 'medium', 'high']
 
 # Size × complexity bucketing.
 # Cut-points are data-driven rather than round guesses: on the 2026-06 ticket
@@ -48,19 +78,85 @@ MIN_TICKETS_THRESHOLD = 5
 # bucket labels stay stable across refreshes and comparable to baseline.
 SIZE_CUT = 150        # lines: ≤ SIZE_CUT is "small"
 FILES_CUT = 5         # files: ≤ FILES_CUT is "simple"
-SIZE_LABELS = [f'0-{SIZE_CUT}', f'{SIZE_CUT + 1}+']
-FILES_LABELS = [f'1-{FILES_CUT}', f'{FILES_CUT + 1}+']
+# Full ascending cut-point lists. Append cuts here for a finer grid (e.g.
+# [50, 150, 400] → 4 size buckets); labels, bins and the weekly cube follow.
+SIZE_CUTS = [SIZE_CUT]
+FILES_CUTS = [FILES_CUT]
+
+
+def _bucket_labels(lowest, cuts):
+    """'lo-hi' labels for each closed-right bin between cuts, then 'last+1+'."""
+    bounds = [lowest] + [c + 1 for c in cuts]
+    return [f'{lo}-{hi}' for lo, hi in zip(bounds, cuts)] + [f'{cuts[-1] + 1}+']
+
+
+SIZE_LABELS = _bucket_labels(0, SIZE_CUTS)
+FILES_LABELS = _bucket_labels(1, FILES_CUTS)
 
 # Paths
 PIPELINE_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = PIPELINE_DIR.parent
 EXPORTS_DIR = PIPELINE_DIR / "data" / "exports"
 JSON_OUTPUT = PROJECT_ROOT / "public" / "data" / "copilot-dashboard-data.json"
+# Sectioned output (--sectioned): one file per top-level payload section plus
+# one per Dev-NN drill-down, each with .gz (and .br, if brotli is installed)
+# siblings, and index.json listing the section hashes. Written alongside
+# JSON_OUTPUT, which stays the single-file payload.
+SECTIONS_DIR = JSON_OUTPUT.parent / "copilot-dashboard"
 # Non-served output: the alias->UUID map for per-user drill-down. The UUID is also
 # shipped inline on each per_user record (identities are surfaced in the individual
 # view); this standalone map is kept for convenience / offline drill-down.
 OUTPUT_DIR = PIPELINE_DIR / "output"
 USER_ID_MAP_OUTPUT = OUTPUT_DIR / "user-id-map.json"
+# Per-stage run report (--report): wall/CPU time, memory and row counts for
+# every pipeline stage of the last refresh. Non-served, like the map above.
+RUN_REPORT_OUTPUT = OUTPUT_DIR / "run-report.json"
+# Incremental-refresh state (see load_state): complete-week input rows plus
+# the week-keyed ticket frames derived from them. Also non-served.
+STATE_DIR = OUTPUT_DIR / "state"
+# Parsed-sheet cache (see read_sheet), keyed by workbook content hash + sheet.
+# Entries unused for XLSX_CACHE_MAX_AGE_DAYS are evicted, then the least
+# recently used ones until the directory fits in XLSX_CACHE_MAX_BYTES.
+# Set XLSX_CACHE_DIR to None (--no-cache) to always parse from the workbook.
+XLSX_CACHE_DIR = OUTPUT_DIR / "cache"
+XLSX_CACHE_MAX_AGE_DAYS = 30
+XLSX_CACHE_MAX_BYTES = 1024 ** 3
+# Sidecar index of every workbook auto-detection has looked at: path, mtime,
+# size, content hash, sheet names and detected PR / telemetry sheets. Entries
+# are refreshed only when a file's mtime or size changes (see workbook_info).
+WORKBOOK_INDEX = OUTPUT_DIR / "workbook-index.json"
+# Timestamp columns coerced once at parse time, so cached frames come back typed.
+DATE_COLUMNS = ('FirstActivity', 'FirstReadyForQADate', 'PRStart', 'PREnd', 'EventDay')
+
+# Column-projected loading (--projected): stream sheets with openpyxl in
+# read-only mode and keep only the columns below — roughly a dozen of the
+# PR sheet's ~20 and the telemetry columns named in COPILOT_RENAMES plus
+# COPILOT_COLUMNS. Add a column here before reading it anywhere downstream.
+XLSX_PROJECTED = False
+PR_COLUMNS = (
+    'JiraTicket', 'AuthorUUID', 'FirstActivity', 'FirstReadyForQADate', 'PREnd',
+    'PRFiles', 'PRLines', 'ChurnLines', 'QAChurnLines', 'Department', 'Email',
+)
+# Telemetry column names per export format -> canonical names.
+COPILOT_RENAMES = {
+    'new': {
+        'AuthorUUID': 'user_id',
+        'suggestionCount': 'suggestions',
+        'acceptedSuggestionCount': 'acceptances',
+        'LineCountAdded': 'loc_added',
+        'LineCountDeleted': 'loc_deleted',
+        'SuggestedLineCountAdd': 'suggested_loc_add',
+        'SuggestedLineCountDelete': 'suggested_loc_delete',
+    },
+    'legacy': {
+        'GithubUserId': 'user_id',
+        'CodeGenerationActivityCount': 'suggestions',
+        'CodeAcceptanceActivityCount': 'acceptances',
+        'LocAddedSum': 'loc_added',
+        'LocDeletedSum': 'loc_deleted',
+    },
+}
+COPILOT_COLUMNS = ('EventDay', 'Department', 'Email', 'UsedAgent', 'UsedChat')
 
 PULL_PATTERN = re.compile(r"^Pull\s+\d{2}_\d{2}_\d{2}$", re.I)
 AI_ALL_PATTERN = re.compile(r"^AI\s+All\s+\d{2}_\d{2}_\d{2}$", re.I)
@@ -68,14 +164,17 @@ PROJECT_KEY_PATTERN = re.compile(r"^([A-Za-z][A-Za-z0-9_]+)-\d+")
 
 
 def find_latest_xlsx() -> Path:
+    """Newest readable workbook in EXPORTS_DIR (skips e.g. Excel ~$ lock files)."""
     xlsx_files = sorted(EXPORTS_DIR.glob("*.xlsx"), key=os.path.getmtime, reverse=True)
-    if not xlsx_files:
-        raise FileNotFoundError(f"No xlsx files in {EXPORTS_DIR}")
-    return xlsx_files[0]
+    for f in xlsx_files:
+        if workbook_info(f)['sheets'] is not None:
+            return f
+    raise FileNotFoundError(f"No xlsx files in {EXPORTS_DIR}")
 
 
 def find_pull_sheet(xl) -> str | None:
-    names = [str(n).strip() for n in xl.sheet_names]
+    """Pick the PR sheet. ``xl`` is a pd.ExcelFile or a list of sheet names."""
+    names = [str(n).strip() for n in getattr(xl, 'sheet_names', xl)]
     if 'Pull Requests' in names:
         return 'Pull Requests'
     for name in names:
@@ -89,9 +188,10 @@ def find_copilot_sheet(xl) -> tuple[str, str] | None:
 
     Returns (sheet_name, format) where format is 'new' (AuthorUUID-based)
     or 'legacy' (GithubUserId-based), or None if no match.
-    Prefers the new AI All format over legacy Copilot_All.
+    Prefers the new AI All format over legacy Copilot_All. ``xl`` is a
+    pd.ExcelFile or a list of sheet names.
     """
-    names = [str(n).strip() for n in xl.sheet_names]
+    names = [str(n).strip() for n in getattr(xl, 'sheet_names', xl)]
     # Prefer new format (AI All MM_DD_YY) — has AuthorUUID for PR correlation
     for name in names:
         if AI_ALL_PATTERN.match(name):
@@ -114,19 +214,285 @@ def find_copilot_file() -> Path | None:
         if not d.exists():
             continue
         for f in sorted(d.glob("*.xlsx"), key=os.path.getmtime, reverse=True):
+            if workbook_info(f)['copilotSheet'] is not None:
+                return f
+    return None
+
+
+_WORKBOOK_INDEX = None
+
+
+def _workbook_index() -> dict:
+    """The sidecar index as {resolved path: entry}, loaded once per run."""
+    global _WORKBOOK_INDEX
+    if _WORKBOOK_INDEX is None:
+        _WORKBOOK_INDEX = {}
+        if WORKBOOK_INDEX.exists():
             try:
-                xl = pd.ExcelFile(f)
-                if find_copilot_sheet(xl) is not None:
-                    return f
-            except Exception:
+                _WORKBOOK_INDEX = json.loads(WORKBOOK_INDEX.read_text(encoding='utf-8')).get('files', {})
+            except (ValueError, OSError):
+                print(f"workbook index: {WORKBOOK_INDEX} unreadable, rebuilding")
+    return _WORKBOOK_INDEX
+
+
+def _save_workbook_index():
+    index = {p: e for p, e in _workbook_index().items() if Path(p).exists()}
+    WORKBOOK_INDEX.parent.mkdir(parents=True, exist_ok=True)
+    tmp = WORKBOOK_INDEX.with_suffix(f'.{os.getpid()}.tmp')
+    tmp.write_text(json.dumps({'version': 1, 'files': index}, indent=2), encoding='utf-8')
+    os.replace(tmp, WORKBOOK_INDEX)
+
+
+def _sha256(path) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def workbook_info(path) -> dict:
+    """Index entry for a workbook, re-read only when its mtime or size changed.
+
+    Entry keys: path, mtime (ns), size, sha256, sheets, pullSheet,
+    copilotSheet, copilotFormat. ``sheets`` is None for files pandas can't
+    open (lock files, truncated downloads), so callers can skip them without
+    retrying every run.
+    """
+    path = Path(path)
+    key = str(path.resolve())
+    st = path.stat()
+    entry = _workbook_index().get(key)
+    if entry and entry['mtime'] == st.st_mtime_ns and entry['size'] == st.st_size:
+        return entry
+    try:
+        names = [str(n) for n in pd.ExcelFile(path).sheet_names]
+    except Exception:
+        names = None
+    copilot = find_copilot_sheet(names) if names else None
+    entry = {
+        'path': key,
+        'mtime': st.st_mtime_ns,
+        'size': st.st_size,
+        'sha256': _sha256(path),
+        'sheets': names,
+        'pullSheet': find_pull_sheet(names) if names else None,
+        'copilotSheet': copilot[0] if copilot else None,
+        'copilotFormat': copilot[1] if copilot else None,
+    }
+    _workbook_index()[key] = entry
+    _save_workbook_index()
+    return entry
+
+
+def file_digest(path) -> str:
+    """SHA-256 of the file contents, from the workbook index."""
+    return workbook_info(path)['sha256']
+
+
+def _cache_path(digest, sheet_name, suffix):
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', str(sheet_name)).strip('_') or 'sheet'
+    return XLSX_CACHE_DIR / f"{digest[:24]}-{slug}{suffix}"
+
+
+def _touch(path):
+    """Mark a cache entry as recently used (eviction is by mtime)."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def sheet_names(path) -> list:
+    """Sheet names of a workbook, from the workbook index."""
+    names = workbook_info(path)['sheets']
+    if names is None:
+        raise ValueError(f"Not a readable workbook: {path}")
+    return names
+
+
+def read_sheet(path, sheet_name=0, columns=None):
+    """Parse one workbook sheet, served from the cache when the bytes are unchanged.
+
+    Keyed by the workbook's content hash and the resolved sheet name, so a
+    renamed or re-downloaded copy of the same export still hits, and any edit
+    misses. Frames are stored with DATE_COLUMNS already coerced to datetime,
+    as pandas pickles (column blocks, no extra dependency) — loading one is
+    orders of magnitude faster than re-parsing the xlsx.
+
+    ``columns`` is the set the caller consumes; with XLSX_PROJECTED on, only
+    those are read (see _stream_sheet) and the cache entry is keyed by the
+    projection too.
+    """
+    if isinstance(sheet_name, int):
+        sheet_name = sheet_names(path)[sheet_name]
+    projection = sorted(columns) if XLSX_PROJECTED and columns else None
+    if XLSX_CACHE_DIR is None:
+        return _parse_sheet(path, sheet_name, projection)
+    suffix = '.pkl'
+    if projection:
+        suffix = '-p' + hashlib.sha256('\0'.join(projection).encode()).hexdigest()[:8] + suffix
+    cached = _cache_path(file_digest(path), sheet_name, suffix)
+    if cached.exists():
+        try:
+            df = pd.read_pickle(cached)
+            _touch(cached)
+            return df
+        except Exception:
+            cached.unlink(missing_ok=True)
+    df = _parse_sheet(path, sheet_name, projection)
+    cached.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cached.with_suffix(f'.{os.getpid()}.tmp')
+    df.to_pickle(tmp)
+    os.replace(tmp, cached)
+    evict_xlsx_cache()
+    return df
+
+
+def _parse_sheet(path, sheet_name, projection=None):
+    df = _stream_sheet(path, sheet_name, projection) if projection else pd.read_excel(path, sheet_name=sheet_name)
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+
+def _stream_sheet(path, sheet_name, columns):
+    """Read only ``columns`` of one sheet, streaming rows in openpyxl read-only mode.
+
+    Values are collected straight into per-column lists, so the other
+    columns are never materialized and no intermediate all-columns frame is
+    built. Cells are converted the way pd.read_excel converts them (integral
+    floats become ints, empty cells NaN, all-empty rows skipped), so the
+    result matches ``read_excel(...)[columns]``.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb[sheet_name].iter_rows(values_only=True)
+        header = next(rows, ())
+        keep = [(i, h) for i, h in enumerate(header) if h is not None and str(h) in columns]
+        values = [[] for _ in keep]
+        for row in rows:
+            if all(v is None for v in row):
                 continue
-    return None
+            width = len(row)
+            for out, (i, _) in zip(values, keep):
+                v = row[i] if i < width else None
+                out.append(int(v) if isinstance(v, float) and v.is_integer() else v)
+    finally:
+        wb.close()
+    return pd.DataFrame({str(h): pd.Series(vals, dtype=None if vals else object) for (_, h), vals in zip(keep, values)})
+
+
+def evict_xlsx_cache(max_age_days=None, max_bytes=None, cache_dir=None):
+    """Drop cache entries older than max_age_days, then LRU until under max_bytes.
+
+    ``cache_dir`` defaults to the sheet cache, XLSX_CACHE_DIR.
+    """
+    cache_dir = XLSX_CACHE_DIR if cache_dir is None else cache_dir
+    if cache_dir is None or not cache_dir.exists():
+        return
+    max_age_days = XLSX_CACHE_MAX_AGE_DAYS if max_age_days is None else max_age_days
+    max_bytes = XLSX_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = sorted((f.stat().st_mtime, f.stat().st_size, f) for f in cache_dir.iterdir()
+                     if f.is_file() and f.suffix != '.tmp')
+    cutoff = time.time() - max_age_days * 86400
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, f in entries:
+        if mtime >= cutoff and total <= max_bytes:
+            continue
+        f.unlink(missing_ok=True)
+        total -= size
+
+
+# Calendar dimension. Weeks run Monday-Sunday and are keyed by an integer id:
+# week k ends on Sunday WEEK_ORIGIN + 7k days (1970-01-04, the epoch's first
+# Sunday). Every stage buckets dates with week_ending and reads a week's
+# phase and label off one week_calendar instead of recomputing them.
+WEEK_ORIGIN = date(1970, 1, 4)
+# WEEK_ORIGIN in days since the epoch; plain ints, so importing works without numpy.
+_ORIGIN_DAY = (WEEK_ORIGIN - date(1970, 1, 1)).days
+
 
+def _epoch_days(values):
+    """(days since 1970-01-01, ticks per day) of a datetime64 array, via its int64 ticks."""
+    day = np.timedelta64(1, 'D') // np.timedelta64(1, np.datetime_data(values.dtype)[0])
+    return values.view(np.int64) // day, day
 
-def load_prs(input_path, sheet_name=None):
+
+def week_ids(dates):
+    """Integer id of the Mon-Sun week holding each date in ``dates`` (no NaT)."""
+    days, _ = _epoch_days(np.asarray(dates, dtype='datetime64'))
+    return -((_ORIGIN_DAY - days) // 7)   # ceil: a Sunday closes its own week
+
+
+def week_ending(dates):
+    """The Sunday that closes each date's Mon-Sun week, at midnight; NaT stays NaT.
+
+    Same values as ``.dt.to_period('W-SUN').dt.end_time.dt.normalize()``, in
+    the input's datetime unit, from int64 tick arithmetic rather than through
+    Period objects (about 10x faster).
+    """
+    values = dates.to_numpy()
+    days, day = _epoch_days(values)
+    sundays = (days + (_ORIGIN_DAY - days) % 7) * day
+    return pd.Series(np.where(np.isnat(values), values.view(np.int64), sundays).view(values.dtype),
+                     index=dates.index)
+
+
+def week_calendar(*dates):
+    """The calendar dimension covering every date in ``dates`` (Series of datetimes).
+
+    One row per week from the earliest to the latest week, indexed by week id
+    (WeekId): the Sunday ``WeekEnding``, its ``phase`` (baseline before
+    BASELINE_END, mature from MATURE_START, transition in between) and its
+    ``label`` as written to the payload. Look weeks up with week_lookup.
+    """
+    ids = np.concatenate([week_ids(d.dropna()) for d in dates if d is not None] or [np.empty(0, np.int64)])
+    week_id = pd.RangeIndex(ids.min(), ids.max() + 1, name='WeekId') if len(ids) else pd.RangeIndex(0, name='WeekId')
+    sundays = np.datetime64(WEEK_ORIGIN, 'D') + 7 * week_id.to_numpy()
+    return pd.DataFrame({
+        'WeekEnding': pd.DatetimeIndex(sundays),
+        'phase': np.select(
+            [sundays < np.datetime64(BASELINE_END), sundays < np.datetime64(MATURE_START)],
+            ['baseline', 'transition'], 'mature'),
+        'label': np.datetime_as_string(sundays, unit='D'),
+    }, index=week_id)
+
+
+def week_lookup(calendar, weeks, column):
+    """``column`` of ``calendar`` for each (non-null) week date in ``weeks``, joined on week id."""
+    return calendar[column].to_numpy()[week_ids(weeks) - calendar.index.start]
+
+
+# Partial PR aggregates for chunked CSV loads (see _load_prs_chunked). Every
+# reducer is associative, so folding a chunk and merging two partials are the
+# same groupby. PRCount is the number of PR rows a partial row stands for.
+PR_PARTIAL_AGGREGATIONS = {
+    'PRCount': 'sum',
+    'FirstActivity': 'min',
+    'PREnd': 'max',
+    'FirstPREnd': 'min',
+    'PRFiles': 'max',
+    'PRLines': 'sum',
+    'ChurnLines': 'sum',
+    'QAChurnLines': 'sum',
+}
+
+
+def load_prs(input_path, sheet_name=None, chunksize=None):
+    """Load PR rows from an xlsx sheet or CSV export.
+
+    With ``chunksize`` a CSV is streamed out-of-core instead (see
+    _load_prs_chunked) and the frame holds partial aggregates, not PR rows.
+    """
     p = Path(input_path)
+    if chunksize and p.suffix not in ('.xlsx', '.xls'):
+        return _load_prs_chunked(p, chunksize)
     if p.suffix in ('.xlsx', '.xls'):
-        df = pd.read_excel(p, sheet_name=sheet_name or 0)
+        df = read_sheet(p, sheet_name or 0, PR_COLUMNS)
     else:
         df = pd.read_csv(p, parse_dates=['FirstActivity', 'FirstReadyForQADate', 'PRStart', 'PREnd'])
     # Exports that ship only FirstReadyForQADate (no separate FirstActivity column)
@@ -147,93 +513,421 @@ def load_prs(input_path, sheet_name=None):
     return df
 
 
-def extract_project_key(jira_ticket):
-    """Extract the Jira project key prefix (part before the first '-') from a ticket ID.
+def _fold_pr_partials(frames, keys):
+    df = pd.concat(frames, ignore_index=True)
+    aggs = {col: how for col, how in PR_PARTIAL_AGGREGATIONS.items() if col in df.columns}
+    return df.groupby(keys, dropna=False, sort=False).agg(aggs).reset_index()
+
+
+def _load_prs_chunked(p, chunksize):
+    """Stream a CSV PR export, folding each chunk into mergeable partials.
 
+    Rows are reduced to one per (JiraTicket, AuthorUUID, PR week, Department,
+    Email) with PR_PARTIAL_AGGREGATIONS, so peak memory tracks the number of
+    tickets rather than PR rows. Keying on the author keeps the author sets,
+    keying on the week keeps the partial-week filter and the per-week Copilot
+    join exact, and keying on Department/Email keeps their modal counts
+    (weighted by PRCount). FirstPREnd preserves the earliest PR end for the
+    reported data range. Columns the pipeline doesn't read are dropped.
+    """
+    partial = None
+    keys = None
+    n_rows = dropped = 0
+    for chunk in pd.read_csv(p, chunksize=chunksize):
+        n_rows += len(chunk)
+        if 'FirstActivity' not in chunk.columns and 'FirstReadyForQADate' in chunk.columns:
+            chunk['FirstActivity'] = chunk['FirstReadyForQADate']
+        for col in ('FirstActivity', 'PREnd'):
+            if col in chunk.columns:
+                chunk[col] = pd.to_datetime(chunk[col], errors='coerce')
+        before = len(chunk)
+        chunk = chunk.dropna(subset=['JiraTicket', 'AuthorUUID', 'PREnd'])
+        dropped += before - len(chunk)
+        if keys is None:
+            keys = ['JiraTicket', 'AuthorUUID', 'PRWeek'] + [c for c in ('Department', 'Email') if c in chunk.columns]
+        chunk = chunk.assign(
+            PRWeek=week_ending(chunk['PREnd']),
+            PRCount=1,
+            FirstPREnd=chunk['PREnd'],
+        )
+        partial = _fold_pr_partials([chunk] if partial is None else [partial, chunk], keys)
+    if dropped:
+        print(f"load_prs: dropped {dropped} PR rows with null JiraTicket / AuthorUUID / PREnd")
+    if partial is None:
+        return pd.read_csv(p, nrows=0)
+    print(f"load_prs: folded {n_rows} PR rows into {len(partial)} (ticket, author, week) partials")
+    return partial.drop(columns='PRWeek')
+
+
+# Identifier columns dictionary-encoded at load time (see encode_keys). The
+# PR author and telemetry user ids share one dictionary so they join on codes.
+KEY_COLUMNS = {
+    'AuthorUUID': 'user', 'user_id': 'user',
+    'JiraTicket': 'ticket',
+    'Department': 'Department', 'Email': 'Email',
+}
+# Dictionaries whose values are stringified first, as the joins always did.
+STR_KEYS = ('user', 'ticket')
+
+
+def _sorted_categories(values):
+    """Distinct ``values`` in sort order (first-seen order if they don't sort)."""
+    categories = pd.Index(values).dropna().unique()
+    try:
+        return categories.sort_values()
+    except TypeError:
+        return categories
+
+
+def _recode(col, dtype, as_str):
+    """``col`` as categorical ``dtype``, converting each distinct value once."""
+    codes, uniques = pd.factorize(col)
+    if as_str:
+        uniques = uniques.astype(str)
+    # Null values keep code -1 through the trailing sentinel.
+    lookup = np.append(dtype.categories.get_indexer(uniques), -1)
+    return pd.Categorical.from_codes(lookup[codes], dtype=dtype)
+
+
+def _key_values(frames):
+    """Distinct id values per KEY_COLUMNS dictionary across ``frames`` (str for STR_KEYS)."""
+    values = {}
+    for df in frames.values():
+        for col, key in KEY_COLUMNS.items():
+            if col in df.columns:
+                distinct = df[col].dropna().unique()
+                if key in STR_KEYS:
+                    distinct = pd.Index(distinct).astype(str)
+                values.setdefault(key, []).append(pd.Index(distinct, dtype=object))
+    return values
+
+
+def _encode_frames(frames, dtypes, stage='encode_keys'):
+    """Recode the id columns of ``frames`` onto ``dtypes``; returns the encoded frames.
+
+    With a run report active, the id columns' deep memory before and after
+    is added to its ``keyEncoding`` entry (measuring the string columns costs
+    about as much as encoding them, so it is opt-in). Stored state frames are
+    not counted.
+    """
+    measure = _RUN_REPORT is not None
+    before = after = 0
+    encoded = {}
+    for name, df in frames.items():
+        cols = [c for c in KEY_COLUMNS if c in df.columns]
+        counted = measure and not name.startswith('state_')
+        if counted:
+            before += int(df[cols].memory_usage(index=False, deep=True).sum())
+        df = df.assign(**{c: _recode(df[c], dtypes[KEY_COLUMNS[c]], KEY_COLUMNS[c] in STR_KEYS) for c in cols})
+        if counted:
+            after += int(df[cols].memory_usage(index=False, deep=True).sum())
+        encoded[name] = df
+
+    sizes = {key: len(d.categories) for key, d in dtypes.items()}
+    print(f"{stage}: {', '.join(f'{n} {key}' for key, n in sizes.items())} ids dictionary-encoded")
+    if measure:
+        entry = _RUN_REPORT.setdefault('keyEncoding', {'beforeBytes': 0, 'afterBytes': 0, 'dictionaries': {}})
+        entry['beforeBytes'] += before
+        entry['afterBytes'] += after
+        entry['dictionaries'].update(sizes)
+        mb = 1024 ** 2
+        print(f"{stage}: id columns {entry['beforeBytes'] / mb:.1f} MB -> {entry['afterBytes'] / mb:.1f} MB")
+    return encoded
+
+
+def encode_keys(prs, copilot_df=None, state=None):
+    """Dictionary-encode the identifier columns of both sources as shared categoricals.
+
+    AuthorUUID (PR rows) and user_id (telemetry) get one dictionary over the
+    str form of both, so the author-week Copilot join and the per-user panel
+    merge run on integer codes. JiraTicket, Department and Email get their
+    own. Categories are sorted, so code order is string order and sorted
+    groupbys are unchanged; strings come back only where a value reaches the
+    payload. ``state`` frames (incremental refresh) are recoded onto the same
+    dictionaries so new and stored rows still concatenate as categoricals —
+    the stored telemetry only alongside ``copilot_df``. Without telemetry the
+    dictionaries cover the PR side alone; extend_keys widens them once the
+    telemetry is loaded.
+
+    With a run report active, the id columns' deep memory before and after
+    is measured and recorded under ``keyEncoding``.
+
+    Returns (prs, copilot_df); ``state`` is updated in place.
+    """
+    frames = {'prs': prs, 'copilot': copilot_df}
+    if state is not None:
+        stored = ('prs', 'tickets', 'ticket_authors') + (('copilot',) if copilot_df is not None else ())
+        frames.update({f'state_{name}': state.get(name) for name in stored})
+    frames = {name: df for name, df in frames.items() if df is not None}
+
+    dtypes = {key: pd.CategoricalDtype(_sorted_categories(parts[0].append(parts[1:])))
+              for key, parts in _key_values(frames).items()}
+    encoded = _encode_frames(frames, dtypes)
+    if state is not None:
+        state.update({name[len('state_'):]: df for name, df in encoded.items() if name.startswith('state_')})
+    return encoded['prs'], encoded.get('copilot')
+
+
+def extend_keys(facts, copilot_df, state=None):
+    """Encode telemetry ids onto the dictionaries of PR-side frames already encoded.
+
+    The PR half of encode_keys runs before the telemetry is loaded, so PR
+    aggregation need not wait for it. This is the other half: each
+    dictionary of ``facts`` (any frame with encode_keys categoricals, e.g.
+    the fact table) is widened by the ids only the telemetry has, the
+    fact columns are remapped onto the widened categories (sorted as before,
+    so code order is still string order), and ``copilot_df`` plus the stored
+    telemetry in ``state`` are encoded onto the same dictionaries.
+
+    Returns (facts, copilot_df); ``state`` is updated in place.
+    """
+    frames = {'copilot': copilot_df}
+    if state is not None and state.get('copilot') is not None:
+        frames['state_copilot'] = state['copilot']
+    values = _key_values(frames)
+    seeds = {}
+    for col, key in KEY_COLUMNS.items():
+        if col in facts.columns and isinstance(facts[col].dtype, pd.CategoricalDtype):
+            seeds.setdefault(key, facts[col].cat.categories)
+    dtypes = {}
+    for key in {**seeds, **values}:
+        parts = [pd.Index(seeds[key], dtype=object)] if key in seeds else []
+        parts += values.get(key, [])
+        dtypes[key] = pd.CategoricalDtype(_sorted_categories(parts[0].append(parts[1:])))
+
+    widened = {c: facts[c].cat.set_categories(dtypes[KEY_COLUMNS[c]].categories)
+               for c in facts.columns
+               if c in KEY_COLUMNS and c != 'user_id' and isinstance(facts[c].dtype, pd.CategoricalDtype)
+               and not facts[c].cat.categories.equals(dtypes[KEY_COLUMNS[c]].categories)}
+    if widened:
+        facts = facts.assign(**widened)
+    encoded = _encode_frames(frames, dtypes, 'extend_keys')
+    if 'state_copilot' in encoded:
+        state['copilot'] = encoded['state_copilot']
+    return facts, encoded['copilot']
+
+
+def extract_project_key(jira_tickets):
+    """Extract the Jira project key prefix (part before the first '-') from ticket IDs.
+
+    Vectorized over a Series of ticket IDs; returns a Series on the same index.
     Examples: 'MYAPP-123' -> 'MYAPP', 'web_ui-42' -> 'WEB_UI', '' -> 'UNKNOWN'.
     Normalizes to uppercase so case variants collapse to one project.
     """
-    if jira_ticket is None:
-        return 'UNKNOWN'
-    s = str(jira_ticket).strip()
-    m = PROJECT_KEY_PATTERN.match(s)
-    if m:
-        return m.group(1).upper()
-    return 'UNKNOWN'
-
-
-def aggregate_to_tickets(prs):
-    """Aggregate PRs to Jira tickets with team-wide metrics (no pilot/non-pilot split)."""
-    prs = prs.copy()
-
-    def agg_ticket(g):
-        return pd.Series({
-            'PRCount': len(g),
-            'FirstActivity': g['FirstActivity'].min(),
-            'PREnd': g['PREnd'].max(),
-            'AuthorUUIDs': ','.join(g['AuthorUUID'].unique().astype(str)),
-            'MaxFiles': g['PRFiles'].max(),
-            'TotalLines': g['PRLines'].sum(),
-            'TotalChurnLines': g['ChurnLines'].sum(),
-            'TotalQAChurnLines': g['QAChurnLines'].sum(),
-        })
-
-    tickets = prs.groupby('JiraTicket').apply(agg_ticket).reset_index()
+    if isinstance(jira_tickets.dtype, pd.CategoricalDtype):
+        # Dictionary-encoded (encode_keys): extract once per distinct ticket.
+        keys = extract_project_key(pd.Series(jira_tickets.cat.categories))
+        return pd.Series(np.append(keys.to_numpy(dtype=object), 'UNKNOWN')[jira_tickets.cat.codes],
+                         index=jira_tickets.index)
+    keys = jira_tickets.astype(str).str.strip().str.extract(PROJECT_KEY_PATTERN, expand=False)
+    return keys.str.upper().fillna('UNKNOWN')
+
+
+# Ticket-level named aggregations: output column -> (fact column, reducer).
+# ticket_view rolls the fact table up to tickets with these. Fact columns
+# missing from an export are skipped; missing sum columns are then filled
+# with 0. The copilot_* columns exist when the fact table was built with
+# AuthorUUID-keyed telemetry.
+TICKET_AGGREGATIONS = {
+    'FirstActivity': ('FirstActivity', 'min'),
+    'PREnd': ('PREnd', 'max'),
+    'MaxFiles': ('PRFiles', 'max'),
+    'TotalLines': ('PRLines', 'sum'),
+    'TotalChurnLines': ('ChurnLines', 'sum'),
+    'TotalQAChurnLines': ('QAChurnLines', 'sum'),
+    'CopilotAssisted': ('copilot_assisted', 'max'),
+    'TotalSuggestions': ('copilot_suggestions', 'sum'),
+    'TotalAcceptances': ('copilot_acceptances', 'sum'),
+}
+# Ticket attributes derived from the rollup (see _ticket_attributes) and
+# broadcast onto every fact row of the ticket.
+TICKET_ATTRIBUTES = ('PREndDate', 'WeekEnding', 'HasQAChurn', 'Project', 'CopilotAssisted')
+# Size × complexity buckets (see size_buckets). Derived from the ticket view
+# rather than stored in the fact table, so the bucketing cuts reach only the
+# size × complexity sections.
+BUCKET_ATTRIBUTES = ('SizeBucket', 'ComplexityBucket')
+
+
+def _ticket_rollup(facts, extra=None):
+    """One row per JiraTicket (sorted): PRCount, every TICKET_AGGREGATIONS output and ``extra`` aggregations."""
+    named = {out: (src, how) for out, (src, how) in TICKET_AGGREGATIONS.items() if src in facts.columns}
+    # Fact rows carry their own PR count.
+    tickets = facts.groupby('JiraTicket', observed=True).agg(PRCount=('PRCount', 'sum'), **named, **(extra or {}))
+    for out, (src, how) in TICKET_AGGREGATIONS.items():
+        if how == 'sum' and out not in tickets.columns and not src.startswith('copilot_'):
+            tickets[out] = 0
+    if 'CopilotAssisted' in tickets.columns:
+        tickets['CopilotAssisted'] = tickets['CopilotAssisted'].astype(int)
+    return tickets.reset_index()
+
+
+def _ticket_attributes(tickets):
+    """Add the derived TICKET_ATTRIBUTES to a ticket rollup; returns it."""
     tickets['PREndDate'] = pd.to_datetime(tickets['PREnd']).dt.normalize()
     # Mon-Sun ISO calendar week, indexed by the Sunday end-of-week date.
-    tickets['WeekEnding'] = tickets['PREndDate'].dt.to_period('W-SUN').dt.end_time.dt.normalize()
+    tickets['WeekEnding'] = week_ending(tickets['PREndDate'])
     tickets['HasQAChurn'] = (tickets['TotalQAChurnLines'] > 0).astype(int)
-    tickets['SizeBucket'] = pd.cut(tickets['TotalLines'], bins=[0, SIZE_CUT, np.inf], labels=SIZE_LABELS, right=True)
-    tickets['ComplexityBucket'] = pd.cut(tickets['MaxFiles'], bins=[0, FILES_CUT, np.inf], labels=FILES_LABELS, right=True)
-    tickets['Project'] = tickets['JiraTicket'].apply(extract_project_key)
+    tickets['Project'] = extract_project_key(tickets['JiraTicket'])
     return tickets
 
 
-def compute_weekly_team_metrics(tickets):
+def build_fact_table(prs, copilot_df=None):
+    """The ticket × author × week fact table every dashboard section aggregates.
+
+    One row per (JiraTicket, AuthorUUID, PR week, Department, Email) — the
+    chunked loader's partial grain, so its partials fold as they are — with
+    the PR measures reduced by PR_PARTIAL_AGGREGATIONS and PRCount PRs per
+    row. The ticket attributes (TICKET_ATTRIBUTES: completion date and week,
+    QA flag, project, Copilot assist) are broadcast onto every row of their
+    ticket. AuthorUUID-keyed telemetry
+    (``copilot_df``) is joined on by join_copilot.
+    """
+    keys = ['JiraTicket', 'AuthorUUID', 'PRWeek'] + [c for c in ('Department', 'Email') if c in prs.columns]
+    aggs = {col: how for col, how in PR_PARTIAL_AGGREGATIONS.items() if col in prs.columns or col == 'PRCount'}
+    facts = prs.assign(
+        PRWeek=week_ending(pd.to_datetime(prs['PREnd'])),
+        PRCount=prs['PRCount'].fillna(1) if 'PRCount' in prs.columns else 1,
+    ).groupby(keys, dropna=False, sort=False, observed=True).agg(aggs).reset_index()
+
+    tickets = _ticket_attributes(_ticket_rollup(facts))
+    rows_of = pd.Index(tickets['JiraTicket']).get_indexer(facts['JiraTicket'])
+    for col in TICKET_ATTRIBUTES:
+        if col in tickets.columns:
+            facts[col] = tickets[col].iloc[rows_of].reset_index(drop=True)
+    return join_copilot(facts, copilot_df) if copilot_df is not None else facts
+
+
+def join_copilot(facts, copilot_df):
+    """The fact table (build_fact_table) with AuthorUUID-keyed telemetry joined on.
+
+    copilot_suggestions and copilot_acceptances hold the author's Copilot
+    totals for the PR week once per PR, copilot_assisted flags rows with any
+    suggestions, and the CopilotAssisted ticket attribute flags every row of
+    a ticket with any assisted row. ``facts`` itself is left as it is.
+    """
+    # Author-week Copilot totals, joined on the shared user codes.
+    copilot_weekly = copilot_df.groupby(['user_id', 'week'], observed=True).agg(
+        suggestions=('suggestions', 'sum'),
+        acceptances=('acceptances', 'sum'),
+    ).reset_index()
+    joined = facts[['AuthorUUID', 'PRWeek']].merge(
+        copilot_weekly, left_on=['AuthorUUID', 'PRWeek'], right_on=['user_id', 'week'], how='left')
+    suggestions = joined['suggestions'].fillna(0).to_numpy()
+    facts = facts.assign(
+        copilot_assisted=(suggestions > 0).astype(int),
+        copilot_suggestions=suggestions * facts['PRCount'],
+        copilot_acceptances=joined['acceptances'].fillna(0).to_numpy() * facts['PRCount'],
+    )
+    facts['CopilotAssisted'] = facts.groupby('JiraTicket', observed=True)['copilot_assisted'].transform('max')
+    return facts
+
+
+def ticket_view(facts):
+    """The ticket-level view of a fact table (build_fact_table).
+
+    Returns (tickets, ticket_authors):
+      - tickets: one row per JiraTicket (sorted) with PRCount, the
+        TICKET_AGGREGATIONS totals and the TICKET_ATTRIBUTES.
+      - ticket_authors: the distinct (JiraTicket, AuthorUUID) pairs with
+        their ticket's attributes. Author lists and distinct-author counts
+        come from this bridge rather than per-group string joins.
+    """
+    # Attributes are constant per ticket; CopilotAssisted is already a rollup.
+    tickets = _ticket_rollup(facts, {col: (col, 'first') for col in TICKET_ATTRIBUTES
+                                     if col in facts.columns and col not in TICKET_AGGREGATIONS})
+    bridge = ['JiraTicket', 'AuthorUUID'] + [c for c in TICKET_ATTRIBUTES if c in facts.columns]
+    ticket_authors = facts[bridge].drop_duplicates(['JiraTicket', 'AuthorUUID']).reset_index(drop=True)
+    return tickets, ticket_authors
+
+
+def size_buckets(tickets, ticket_authors):
+    """The ticket view (ticket_view) with each ticket's size / complexity bucket on both frames.
+
+    SizeBucket cuts TotalLines at SIZE_CUTS and ComplexityBucket cuts
+    MaxFiles at FILES_CUTS; the bridge gets its ticket's buckets too, so
+    count_authors groups on them without a merge. Returns (tickets,
+    ticket_authors); the inputs are left as they are.
+    """
+    tickets = tickets.assign(
+        SizeBucket=pd.cut(tickets['TotalLines'], bins=[0, *SIZE_CUTS, np.inf], labels=SIZE_LABELS, right=True),
+        ComplexityBucket=pd.cut(tickets['MaxFiles'], bins=[0, *FILES_CUTS, np.inf], labels=FILES_LABELS, right=True),
+    )
+    rows_of = pd.Index(tickets['JiraTicket']).get_indexer(ticket_authors['JiraTicket'])
+    ticket_authors = ticket_authors.assign(**{col: tickets[col].iloc[rows_of].set_axis(ticket_authors.index)
+                                              for col in BUCKET_ATTRIBUTES})
+    return tickets, ticket_authors
+
+
+def count_authors(tickets, ticket_authors, by=None):
+    """Distinct authors across ``tickets``, optionally per group of ticket columns.
+
+    ``ticket_authors`` is the (JiraTicket, AuthorUUID) bridge from
+    ticket_view, restricted to whatever subset of tickets the caller passes
+    in, so a filtered ticket frame yields the distinct authors of exactly
+    those tickets. Ticket attributes the bridge already carries are grouped
+    on directly; any other ``by`` column is joined in from ``tickets``.
+    Returns an int when ``by`` is None, else a Series indexed by the observed
+    ``by`` groups.
+    """
+    by = list(by) if by else []
+    if set(by) <= set(ticket_authors.columns):
+        pairs = ticket_authors[ticket_authors['JiraTicket'].isin(tickets['JiraTicket'])]
+    else:
+        pairs = ticket_authors[['JiraTicket', 'AuthorUUID']].merge(tickets[['JiraTicket'] + by], on='JiraTicket')
+    if not by:
+        return int(pairs['AuthorUUID'].nunique())
+    return pairs.groupby(by, observed=True)['AuthorUUID'].nunique()
+
+
+def aggregate_to_tickets(prs):
+    """Aggregate PRs to Jira tickets with team-wide metrics (no pilot/non-pilot split).
+
+    Shorthand for size_buckets(*ticket_view(build_fact_table(prs))); returns
+    (tickets, ticket_authors).
+    """
+    return size_buckets(*ticket_view(build_fact_table(prs)))
+
+
+def compute_weekly_team_metrics(tickets, ticket_authors):
     """Compute team-wide productivity and QA churn per week.
 
     `tickets` is expected to be pre-filtered by the caller to exclude any
     partial trailing week (week whose Sunday-end is past the data cutoff).
     Partial weeks are hidden entirely from the dashboard, so they don't
     appear here either.
+
+    All weeks are computed in one grouped pass: ticket counts and sums from a
+    single groupby on WeekEnding, distinct authors from a grouped nunique
+    over the ticket-author bridge.
     """
-    all_weeks = tickets['WeekEnding'].dropna().unique()
-    all_weeks = pd.DatetimeIndex(all_weeks).sort_values()
-
-    rows = []
-    for week in all_weeks:
-        wk_tickets = tickets[tickets['WeekEnding'] == week]
-        total_tickets = len(wk_tickets)
-
-        # Count actual unique authors this week
-        authors_set = set()
-        for uuids_str in wk_tickets['AuthorUUIDs']:
-            authors_set.update(str(uuids_str).split(','))
-        team_authors = max(len(authors_set), 1)
-
-        team_prod = total_tickets / (team_authors * WORKDAYS_PER_WEEK)
-        team_qa = wk_tickets['HasQAChurn'].sum() / total_tickets if total_tickets > 0 else None
-
-        rows.append({
-            'WeekEnding': week,
-            'TotalTickets': total_tickets,
-            'TeamAuthors': team_authors,
-            'TeamProductivity': team_prod,
-            'TeamQAChurnRate': team_qa,
-            # Raw output volume — reconciles ticket-based productivity with
-            # PR/commit counts from external tools (Bitbucket/Qlik): PRs per
-            # ticket can rise while tickets/FTE-day stays flat.
-            'TotalPRs': int(wk_tickets['PRCount'].sum()),
-            'TotalLines': int(wk_tickets['TotalLines'].sum()),
-            'LowConfidence': total_tickets < MIN_TICKETS_THRESHOLD,
-        })
+    tickets = tickets[tickets['WeekEnding'].notna()]
+    weekly = tickets.groupby('WeekEnding').agg(
+        TotalTickets=('JiraTicket', 'size'),
+        QATickets=('HasQAChurn', 'sum'),
+        # Raw output volume — reconciles ticket-based productivity with
+        # PR/commit counts from external tools (Bitbucket/Qlik): PRs per
+        # ticket can rise while tickets/FTE-day stays flat.
+        TotalPRs=('PRCount', 'sum'),
+        TotalLines=('TotalLines', 'sum'),
+    )
 
-    weekly = pd.DataFrame(rows)
+    # Actual unique authors per week
+    team_authors = count_authors(tickets, ticket_authors, ['WeekEnding'])
+    weekly['TeamAuthors'] = team_authors.reindex(weekly.index, fill_value=0).clip(lower=1).astype(int)
 
-    return weekly
+    weekly['TeamProductivity'] = weekly['TotalTickets'] / (weekly['TeamAuthors'] * WORKDAYS_PER_WEEK)
+    weekly['TeamQAChurnRate'] = weekly['QATickets'] / weekly['TotalTickets']
+    weekly['TotalPRs'] = weekly['TotalPRs'].astype(int)
+    weekly['TotalLines'] = weekly['TotalLines'].astype(int)
+    weekly['LowConfidence'] = weekly['TotalTickets'] < MIN_TICKETS_THRESHOLD
 
+    return weekly.reset_index()[[
+        'WeekEnding', 'TotalTickets', 'TeamAuthors', 'TeamProductivity', 'TeamQAChurnRate',
+        'TotalPRs', 'TotalLines', 'LowConfidence',
+    ]]
 
-def compute_baseline(tickets, weekly):
+
+def compute_baseline(tickets, ticket_authors, weekly):
     """Compute pre-AI baseline metrics for the whole team (before Oct 2025).
 
     Uses mean-of-weekly productivity (same method as compute_team_summary)
@@ -242,10 +936,7 @@ def compute_baseline(tickets, weekly):
     baseline_end_ts = pd.Timestamp(BASELINE_END)
     baseline = tickets[tickets['PREndDate'] < baseline_end_ts]
     total = len(baseline)
-    authors_set = set()
-    for uuids_str in baseline['AuthorUUIDs']:
-        authors_set.update(str(uuids_str).split(','))
-    authors = len(authors_set)
+    authors = count_authors(baseline, ticket_authors)
     workdays = len(baseline['WeekEnding'].unique()) * WORKDAYS_PER_WEEK
 
     # Mean of per-week productivity (matching compute_team_summary methodology)
@@ -269,7 +960,7 @@ def compute_baseline(tickets, weekly):
     }
 
 
-def compute_team_summary(tickets, weekly, baseline):
+def compute_team_summary(tickets, ticket_authors, weekly, baseline):
     """Compute overall team summary for mature adoption period (Feb 7+)."""
     mature_start_ts = pd.Timestamp(MATURE_START)
     post_tickets = tickets[tickets['PREndDate'] >= mature_start_ts]
@@ -284,14 +975,10 @@ def compute_team_summary(tickets, weekly, baseline):
     prod_delta = ((team_prod_avg - baseline['productivity']) / baseline['productivity'] * 100) if baseline['productivity'] > 0 else 0
     qa_delta = ((team_qa - baseline['qa_churn_rate']) / baseline['qa_churn_rate'] * 100) if baseline['qa_churn_rate'] > 0 else 0
 
-    # Unique authors in post-pilot
-    authors_set = set()
-    for uuids_str in post_tickets['AuthorUUIDs']:
-        authors_set.update(str(uuids_str).split(','))
-
     return {
         'total_tickets': int(len(post_tickets)),
-        'team_authors': len(authors_set),
+        # Unique authors in post-pilot
+        'team_authors': count_authors(post_tickets, ticket_authors),
         'team_productivity': round(team_prod_avg, 4),
         'productivity_vs_baseline': f"{'+' if prod_delta >= 0 else ''}{prod_delta:.1f}%",
         'team_qa_churn': round(team_qa, 4),
@@ -300,7 +987,40 @@ def compute_team_summary(tickets, weekly, baseline):
     }
 
 
-def compute_size_complexity(tickets, sc_weekly):
+def build_size_complexity_cube(tickets, ticket_authors, calendar=None):
+    """Per-week, per-bucket ticket/author/QA counts as a dense grid.
+
+    One grouped aggregation over (week, size, complexity) plus a reindex onto
+    the full week × SIZE_LABELS × FILES_LABELS product, so empty cells come
+    back as zero rows and the cost doesn't grow with the number of buckets.
+    Indexed by (WeekEnding, SizeBucket, ComplexityBucket) in chart order;
+    ``productivity`` is rounded exactly as it is plotted, so period means over
+    the cube match the weekly series. Week phases come from ``calendar``
+    (week_calendar; built from the tickets if omitted). ``tickets`` and
+    ``ticket_authors`` carry their buckets (size_buckets).
+    """
+    keys = ['WeekEnding', 'SizeBucket', 'ComplexityBucket']
+    weeks = pd.DatetimeIndex(tickets['WeekEnding'].dropna().unique()).sort_values()
+    grid = pd.MultiIndex.from_product([weeks, SIZE_LABELS, FILES_LABELS], names=keys)
+
+    cells = tickets.groupby(keys, observed=True).agg(
+        tickets=('JiraTicket', 'size'),
+        qaTickets=('HasQAChurn', 'sum'),
+    )
+    cells['authors'] = count_authors(tickets, ticket_authors, keys)
+    cells.index = cells.index.set_levels([lvl.astype(object) for lvl in cells.index.levels[1:]], level=[1, 2])
+    cube = cells.reindex(grid, fill_value=0).astype(int)
+
+    fte_days = cube['authors'].clip(lower=1) * WORKDAYS_PER_WEEK
+    cube['productivity'] = (cube['tickets'] / fte_days).round(6)
+    cube['qaChurn'] = (cube['qaTickets'] / cube['tickets'].where(cube['tickets'] > 0)).round(6)
+    if calendar is None:
+        calendar = week_calendar(tickets['WeekEnding'])
+    cube['phase'] = week_lookup(calendar, cube.index.get_level_values('WeekEnding'), 'phase')
+    return cube
+
+
+def compute_size_complexity(tickets, sc_cube):
     """Compute size/complexity distribution for mature adoption vs pre-AI baseline.
 
     Productivity per bucket is the **mean of weekly** per-bucket productivity
@@ -317,89 +1037,75 @@ def compute_size_complexity(tickets, sc_weekly):
 
     Ticket counts and QA churn remain pooled per period — QA churn is a share
     of tickets, so pooling is denominator-consistent.
+
+    The weekly means come from ``sc_cube`` (build_size_complexity_cube) in a
+    single grouped mean over (phase, size, complexity).
     """
     baseline_end_ts = pd.Timestamp(BASELINE_END)
     mature_start_ts = pd.Timestamp(MATURE_START)
-    post = tickets[tickets['PREndDate'] >= mature_start_ts]
-    pre = tickets[tickets['PREndDate'] < baseline_end_ts]
+    keys = ['SizeBucket', 'ComplexityBucket']
+
+    def pooled(period_tickets):
+        return period_tickets.groupby(keys, observed=True).agg(
+            n=('JiraTicket', 'size'),
+            qa=('HasQAChurn', 'sum'),
+        )
+
+    post = pooled(tickets[tickets['PREndDate'] >= mature_start_ts])
+    pre = pooled(tickets[tickets['PREndDate'] < baseline_end_ts])
+
+    active = sc_cube[sc_cube['tickets'] > 0].reset_index()
+    weekly_mean = active.groupby(['phase'] + keys)['productivity'].mean()
 
     def weekly_mean_productivity(size, complexity, phase):
-        vals = [
-            r['productivity'] for r in sc_weekly
-            if r['size'] == size and r['complexity'] == complexity
-            and r['phase'] == phase and r['tickets'] > 0
-        ]
-        return sum(vals) / len(vals) if vals else 0
+        return weekly_mean.get((phase, size, complexity), 0)
 
     buckets = []
     for size in SIZE_LABELS:
         for complexity in FILES_LABELS:
-            p = post[(post['SizeBucket'] == size) & (post['ComplexityBucket'] == complexity)]
-            b = pre[(pre['SizeBucket'] == size) & (pre['ComplexityBucket'] == complexity)]
-            if len(p) > 0 or len(b) > 0:
-                post_qa = p['HasQAChurn'].sum() / len(p) if len(p) > 0 else 0
-                pre_qa = b['HasQAChurn'].sum() / len(b) if len(b) > 0 else 0
+            p_n, p_qa = post.loc[(size, complexity)] if (size, complexity) in post.index else (0, 0)
+            b_n, b_qa = pre.loc[(size, complexity)] if (size, complexity) in pre.index else (0, 0)
+            if p_n > 0 or b_n > 0:
                 buckets.append({
                     'label': f'{size} / {complexity}',
                     'size': size,
                     'complexity': complexity,
-                    'post_tickets': int(len(p)),
-                    'baseline_tickets': int(len(b)),
+                    'post_tickets': int(p_n),
+                    'baseline_tickets': int(b_n),
                     'post_productivity': weekly_mean_productivity(size, complexity, 'mature'),
                     'baseline_productivity': weekly_mean_productivity(size, complexity, 'baseline'),
-                    'post_qa_churn': post_qa,
-                    'baseline_qa_churn': pre_qa,
+                    'post_qa_churn': p_qa / p_n if p_n > 0 else 0,
+                    'baseline_qa_churn': b_qa / b_n if b_n > 0 else 0,
                 })
     return buckets
 
 
-def compute_size_complexity_weekly(tickets):
+def compute_size_complexity_weekly(sc_cube):
     """Per-week, per-bucket productivity and QA churn for the full timeline.
 
     Emits one row per (week, size, complexity) combination — including zero
     rows for weeks where a bucket saw no activity, so the frontend can render
-    a continuous time series without reconstructing missing weeks.
+    a continuous time series without reconstructing missing weeks. Rows are
+    read straight off ``sc_cube`` (build_size_complexity_cube).
     """
-    baseline_end_ts = pd.Timestamp(BASELINE_END)
-    mature_start_ts = pd.Timestamp(MATURE_START)
-
-    def get_phase(week_ts):
-        if week_ts < baseline_end_ts:
-            return 'baseline'
-        if week_ts < mature_start_ts:
-            return 'transition'
-        return 'mature'
-
-    weeks = sorted(pd.DatetimeIndex(tickets['WeekEnding'].dropna().unique()))
-
-    rows = []
-    for week in weeks:
-        wk = tickets[tickets['WeekEnding'] == week]
-        phase = get_phase(pd.Timestamp(week))
-        week_str = pd.Timestamp(week).strftime('%Y-%m-%d')
-        for size in SIZE_LABELS:
-            for complexity in FILES_LABELS:
-                cell = wk[(wk['SizeBucket'] == size) & (wk['ComplexityBucket'] == complexity)]
-                n = int(len(cell))
-                authors = set()
-                for uuids_str in cell['AuthorUUIDs']:
-                    authors.update(str(uuids_str).split(','))
-                n_authors = len(authors)
-                fte_days = max(n_authors, 1) * WORKDAYS_PER_WEEK
-                productivity = n / fte_days if n > 0 else 0.0
-                qa_churn = float(cell['HasQAChurn'].mean()) if n > 0 else None
-                rows.append({
-                    'week': week_str,
-                    'phase': phase,
-                    'size': size,
-                    'complexity': complexity,
-                    'tickets': n,
-                    'authors': n_authors,
-                    'productivity': round(productivity, 6),
-                    'qaChurn': round(qa_churn, 6) if qa_churn is not None else None,
-                    'lowConfidence': bool(n < MIN_TICKETS_THRESHOLD),
-                })
-    return rows
+    weeks = sc_cube.index.get_level_values('WeekEnding').strftime('%Y-%m-%d')
+    return [
+        {
+            'week': week,
+            'phase': phase,
+            'size': size,
+            'complexity': complexity,
+            'tickets': int(n),
+            'authors': int(n_authors),
+            'productivity': float(prod),
+            'qaChurn': float(qa) if n > 0 else None,
+            'lowConfidence': bool(n < MIN_TICKETS_THRESHOLD),
+        }
+        for week, (_, size, complexity), phase, n, n_authors, prod, qa in zip(
+            weeks, sc_cube.index, sc_cube['phase'], sc_cube['tickets'],
+            sc_cube['authors'], sc_cube['productivity'], sc_cube['qaChurn'],
+        )
+    ]
 
 
 def _fmt_delta(current, base):
@@ -410,10 +1116,10 @@ def _fmt_delta(current, base):
     return f"{'+' if pct >= 0 else ''}{pct:.1f}%"
 
 
-def compute_project_metrics(tickets):
+def compute_project_metrics(tickets, calendar=None):
     """Compute project-level breadth and velocity metrics.
 
-    A "project" is the Jira project key prefix (extracted in aggregate_to_tickets).
+    A "project" is the Jira project key prefix (extracted in build_fact_table).
     Compares the pre-AI baseline window (< BASELINE_END) against the mature
     adoption window (>= MATURE_START):
 
@@ -421,7 +1127,8 @@ def compute_project_metrics(tickets):
     - tickets_per_project:    total tickets / unique projects (overall velocity)
     - avg_projects_per_week:  mean of weekly distinct-project counts (breadth)
 
-    Also emits weekly series (phase-tagged) and a top-10 per-project comparison.
+    Also emits weekly series (phase-tagged from ``calendar``, see week_calendar)
+    and a top-10 per-project comparison.
     """
     baseline_end_ts = pd.Timestamp(BASELINE_END)
     mature_start_ts = pd.Timestamp(MATURE_START)
@@ -456,46 +1163,46 @@ def compute_project_metrics(tickets):
     baseline_summary = summarize_period(baseline_tickets)
     mature_summary = summarize_period(mature_tickets)
 
-    def get_phase(week_ts):
-        if week_ts < baseline_end_ts:
-            return 'baseline'
-        if week_ts < mature_start_ts:
-            return 'transition'
-        return 'mature'
-
     # Weekly series: unique projects and tickets-per-project each week
-    weekly_rows = []
-    for week, grp in tickets.groupby('WeekEnding'):
-        if pd.isna(week):
-            continue
-        active = int(grp['Project'].nunique())
-        total = int(len(grp))
-        weekly_rows.append({
-            'week': pd.Timestamp(week).strftime('%Y-%m-%d'),
-            'phase': get_phase(pd.Timestamp(week)),
+    if calendar is None:
+        calendar = week_calendar(tickets['WeekEnding'])
+    by_week = tickets.groupby('WeekEnding').agg(
+        active=('Project', 'nunique'),
+        total=('Project', 'size'),
+    )
+    weekly_rows = [
+        {
+            'week': label,
+            'phase': phase,
             'activeProjects': active,
             'totalTickets': total,
             'ticketsPerProject': round(total / active, 2) if active else 0.0,
-        })
-    weekly_rows.sort(key=lambda r: r['week'])
+        }
+        for label, phase, active, total in zip(
+            week_lookup(calendar, by_week.index, 'label'), week_lookup(calendar, by_week.index, 'phase'),
+            by_week['active'].tolist(), by_week['total'].tolist(),
+        )
+    ]
 
     # Per-project: baseline vs mature comparison. Ranked by mature ticket count.
-    def project_period_stats(period_df, project):
-        p = period_df[period_df['Project'] == project]
-        if len(p) == 0:
-            return 0, 0, 0.0
-        weeks_active = p['WeekEnding'].nunique()
-        velocity = round(len(p) / weeks_active, 2) if weeks_active else 0.0
-        return int(len(p)), int(weeks_active), velocity
-
-    all_projects = sorted(set(baseline_tickets['Project'].unique()) | set(mature_tickets['Project'].unique()))
+    # Tickets and active weeks for every (project, period) in one grouped pass.
+    period = pd.Series(np.select(
+        [tickets['PREndDate'] < baseline_end_ts, tickets['PREndDate'] >= mature_start_ts],
+        ['baseline', 'mature'], 'transition'), index=tickets.index)
+    in_period = period != 'transition'
+    by_project = tickets[in_period].groupby(['Project', period[in_period]]).agg(
+        tickets=('WeekEnding', 'size'),
+        weeks=('WeekEnding', 'nunique'),
+    ).unstack(fill_value=0).reindex(
+        columns=pd.MultiIndex.from_product([['tickets', 'weeks'], ['baseline', 'mature']]), fill_value=0)
+
+    def velocity(n, weeks_active):
+        return round(n / weeks_active, 2) if weeks_active else 0.0
+
     project_rows = []
-    for project in all_projects:
-        b_tickets, b_weeks, b_vel = project_period_stats(baseline_tickets, project)
-        m_tickets, m_weeks, m_vel = project_period_stats(mature_tickets, project)
-        # Skip projects with zero activity in both periods (shouldn't happen, but defensive)
-        if b_tickets == 0 and m_tickets == 0:
-            continue
+    for project, b_tickets, m_tickets, b_weeks, m_weeks in zip(
+            by_project.index.tolist(), *(by_project[c].astype(int).tolist() for c in by_project.columns)):
+        b_vel, m_vel = velocity(b_tickets, b_weeks), velocity(m_tickets, m_weeks)
         project_rows.append({
             'project': project,
             'baselineTickets': b_tickets,
@@ -532,33 +1239,20 @@ def _load_copilot_df(copilot_path):
     The returned df always has canonical columns: user_id, EventDay,
     suggestions, acceptances, loc_added.
     """
-    xl = pd.ExcelFile(copilot_path)
-    result = find_copilot_sheet(xl)
+    result = find_copilot_sheet(sheet_names(copilot_path))
     if result is None:
         return None, None
 
     sheet_name, fmt = result
-    copilot = pd.read_excel(xl, sheet_name=sheet_name)
+    copilot = read_sheet(copilot_path, sheet_name, set(COPILOT_RENAMES[fmt]) | set(COPILOT_COLUMNS))
+    return prepare_copilot_df(copilot, fmt), fmt
+
+
+def prepare_copilot_df(copilot, fmt):
+    """Normalize raw telemetry rows in export format ``fmt`` to canonical columns."""
     copilot['EventDay'] = pd.to_datetime(copilot['EventDay'], errors='coerce').dt.normalize()
 
-    if fmt == 'new':
-        copilot = copilot.rename(columns={
-            'AuthorUUID': 'user_id',
-            'suggestionCount': 'suggestions',
-            'acceptedSuggestionCount': 'acceptances',
-            'LineCountAdded': 'loc_added',
-            'LineCountDeleted': 'loc_deleted',
-            'SuggestedLineCountAdd': 'suggested_loc_add',
-            'SuggestedLineCountDelete': 'suggested_loc_delete',
-        })
-    else:
-        copilot = copilot.rename(columns={
-            'GithubUserId': 'user_id',
-            'CodeGenerationActivityCount': 'suggestions',
-            'CodeAcceptanceActivityCount': 'acceptances',
-            'LocAddedSum': 'loc_added',
-            'LocDeletedSum': 'loc_deleted',
-        })
+    copilot = copilot.rename(columns=COPILOT_RENAMES[fmt])
 
     # Drop rows with null user_id / EventDay before any aggregation. Without
     # this, distinct-user counts and weekly buckets get polluted by nulls.
@@ -574,7 +1268,7 @@ def _load_copilot_df(copilot_path):
             copilot[col] = copilot[col].fillna(0)
 
     # Mon-Sun ISO calendar week, indexed by the Sunday end-of-week date.
-    copilot['week'] = copilot['EventDay'].dt.to_period('W-SUN').dt.end_time.dt.normalize()
+    copilot['week'] = week_ending(copilot['EventDay'])
 
     # Hide the partial trailing week: drop rows whose Sunday-end is past
     # the observed event-day cutoff. At most one week per pull.
@@ -585,19 +1279,80 @@ def _load_copilot_df(copilot_path):
     if dropped:
         print(f"_load_copilot_df: dropped {dropped} rows in partial trailing week (cutoff {cutoff.strftime('%Y-%m-%d')})")
 
-    return copilot, fmt
+    return copilot
 
 
-def compute_copilot_adoption(copilot_path):
-    """Compute weekly Copilot adoption metrics from GitHub telemetry."""
-    copilot, fmt = _load_copilot_df(copilot_path)
-    if copilot is None:
-        return None, None, None
+def _user_key(ids):
+    """User ids as join keys: encode_keys codes as they are, anything else as str."""
+    return ids if isinstance(ids.dtype, pd.CategoricalDtype) else ids.astype(str)
+
+
+def _modes(ids, col):
+    """Modal ``col`` per (uid, source): weighted counts, ties to the smallest value (as Series.mode)."""
+    rows = ids[ids[col].notna() & (ids['weight'] > 0)]
+    counts = rows.groupby(['uid', 'source', col], sort=False, observed=True)['weight'].sum().reset_index()
+    counts = counts.sort_values(['uid', 'source', 'weight', col], ascending=[True, True, False, True])
+    return counts.drop_duplicates(['uid', 'source'])
+
+
+def resolve_identities(prs, copilot_df=None):
+    """Modal Department and Email per user across PR and telemetry rows, in one pass.
+
+    Returns a frame indexed by str(user id) with:
+      - department: modal PR Department, else modal telemetry Department
+        (users who never authored a PR)
+      - email: local part of the modal Email, same PR-first precedence —
+        enough to identify the user without publishing full addresses
+      - copilotDepartment: modal telemetry Department alone, which defines the
+        Development cohort in compute_copilot_adoption
+    PR modes count PRs (partial-aggregate rows weigh PRCount). A user or
+    export without the column gets None.
+    """
+    sources = []
+    for rank, (df, id_col) in enumerate(((prs, 'AuthorUUID'), (copilot_df, 'user_id'))):
+        if df is None or not len(df):
+            continue
+        weight = df['PRCount'].fillna(1).astype(int).to_numpy() if 'PRCount' in df.columns else 1
+        sources.append(pd.DataFrame({
+            'uid': _user_key(df[id_col]).array,
+            'source': rank,
+            'weight': weight,
+            'Department': df['Department'].array if 'Department' in df.columns else None,
+            'Email': df['Email'].array if 'Email' in df.columns else None,
+        }))
+    columns = ['department', 'email', 'copilotDepartment']
+    if not sources:
+        return pd.DataFrame(columns=columns, index=pd.Index([], dtype=object))
+    ids = pd.concat(sources, ignore_index=True)
+
+    def first_source(modes):
+        # Modes are sorted by (uid, source): the first row per uid is the PR one if any.
+        best = modes.drop_duplicates('uid')
+        return pd.Series(best.iloc[:, 2].to_numpy(), index=best['uid'].to_numpy(), dtype=object)
+
+    dept = _modes(ids, 'Department')
+    email = _modes(ids, 'Email')
+    copilot_dept = dept[dept['source'] == 1]
+    lookup = pd.DataFrame({
+        'department': first_source(dept).map(str),
+        'email': first_source(email).map(lambda e: str(e).split('@')[0].strip()),
+        'copilotDepartment': pd.Series(copilot_dept['Department'].map(str).to_numpy(),
+                                       index=copilot_dept['uid'].to_numpy(), dtype=object),
+    }, index=pd.Index(np.asarray(ids['uid'].unique(), dtype=object)), columns=columns)
+    return lookup.astype(object).where(lookup.notna(), None)
+
+
+def compute_copilot_adoption(copilot, identities=None):
+    """Compute weekly Copilot adoption metrics from GitHub telemetry.
+
+    ``copilot`` is the normalized frame from _load_copilot_df; ``identities``
+    the resolve_identities lookup (resolved from the telemetry alone if omitted).
+    """
 
     total_users = copilot['user_id'].nunique()
 
     # User tiers
-    user_days = copilot.groupby('user_id')['EventDay'].nunique()
+    user_days = copilot.groupby('user_id', observed=True)['EventDay'].nunique()
     heavy = int((user_days >= 30).sum())
     medium = int(((user_days >= 10) & (user_days < 30)).sum())
     light = int((user_days < 10).sum())
@@ -613,59 +1368,74 @@ def compute_copilot_adoption(copilot_path):
     # adoption signal over time. A user's department = modal Department value
     # in their telemetry rows (absent in legacy exports → cohort is empty and
     # the dev fields are omitted).
-    dev_users = set()
-    has_department = 'Department' in copilot.columns
-    if has_department:
-        dept_mode = copilot.groupby(copilot['user_id'].astype(str))['Department'] \
-            .agg(lambda s: s.dropna().mode().iloc[0] if len(s.dropna().mode()) else None)
-        dev_users = {u for u, d in dept_mode.items() if d == 'Development'}
+    if identities is None:
+        identities = resolve_identities(None, copilot)
+    dev_users = set(identities.index[identities['copilotDepartment'] == 'Development'])
 
     # Weekly aggregation.
     #
-    # Denominator note: `copilotPct` uses a rolling 4-week active-user
-    # denominator (distinct users with any Copilot activity in the trailing
-    # 4 weeks including the current week). That's a truer "share of
+    # Denominator note: `copilotPct` uses a rolling ADOPTION_WINDOW-week
+    # active-user denominator (distinct users with any Copilot activity in the
+    # trailing weeks including the current week). That's a truer "share of
     # currently-active developers" than the old lifetime-unique denominator,
     # which kept churned/inactive seats in the denominator forever and
     # suppressed the apparent adoption rate.
-    weekly_groups = list(copilot.groupby('week'))
-    weekly_groups.sort(key=lambda kv: kv[0])
-    weeks_in_order = [w for w, _ in weekly_groups]
-    user_sets_by_week = {w: set(g['user_id'].unique()) for w, g in weekly_groups}
-
+    week_codes, weeks = pd.factorize(copilot['week'], sort=True)
+    user_codes, users = pd.factorize(copilot['user_id'])
+    by_week = copilot.groupby(week_codes)
+    totals = by_week[['suggestions', 'acceptances', 'loc_added']].sum()
+    per_user_week = copilot.groupby([week_codes, user_codes])
+    agent_users = (per_user_week['UsedAgent'].sum() > 0).groupby(level=0).sum() if has_agent else None
+    chat_users = (per_user_week['UsedChat'].sum() > 0).groupby(level=0).sum() if has_chat else None
+
+    # Distinct (week, user) pairs, sorted by week: week_users[bounds[i]:bounds[i + 1]]
+    # are the user codes active in weeks[i].
+    pairs = np.unique(week_codes.astype(np.int64) * len(users) + user_codes)
+    week_users = pairs % len(users)
+    bounds = np.searchsorted(pairs // len(users), np.arange(len(weeks) + 1))
+    is_dev = np.array([str(u) in dev_users for u in users], dtype=bool)
+
+    # Sliding-window multiset: weeks_seen[u] = weeks in the window user u was
+    # active in. Entering and leaving weeks adjust it, and the distinct count
+    # changes only where it crosses zero — O(user-weeks) for any window length.
+    weeks_seen = np.zeros(len(users), dtype=np.int32)
+    rolling_active = dev_rolling = 0
     weekly_rows = []
-    for idx, (week, grp) in enumerate(weekly_groups):
-        active = grp['user_id'].nunique()
-        agent_users = int((grp.groupby('user_id')['UsedAgent'].sum() > 0).sum()) if has_agent else 0
-        chat_users = int((grp.groupby('user_id')['UsedChat'].sum() > 0).sum()) if has_chat else 0
-        window_weeks = weeks_in_order[max(0, idx - 3): idx + 1]
-        rolling_active = set()
-        for w in window_weeks:
-            rolling_active |= user_sets_by_week[w]
-        denom = max(len(rolling_active), 1)
+    for idx, week in enumerate(weeks):
+        if idx >= ADOPTION_WINDOW:
+            leaving = week_users[bounds[idx - ADOPTION_WINDOW]:bounds[idx - ADOPTION_WINDOW + 1]]
+            weeks_seen[leaving] -= 1
+            gone = leaving[weeks_seen[leaving] == 0]
+            rolling_active -= len(gone)
+            dev_rolling -= int(is_dev[gone].sum())
+        entering = week_users[bounds[idx]:bounds[idx + 1]]
+        new = entering[weeks_seen[entering] == 0]
+        weeks_seen[entering] += 1
+        rolling_active += len(new)
+        dev_rolling += int(is_dev[new].sum())
+
+        active = len(entering)
+        denom = max(rolling_active, 1)
         row = {
             'week': pd.Timestamp(week).strftime('%Y-%m-%d'),
             'activeUsers': int(active),
-            'rollingActiveUsers': int(len(rolling_active)),
+            'rollingActiveUsers': int(rolling_active),
             'copilotPct': round(active / denom * 100, 1),
-            'totalCodeGen': int(grp['suggestions'].sum()),
-            'totalCodeAccept': int(grp['acceptances'].sum()),
-            'agentUsers': agent_users,
-            'chatUsers': chat_users,
-            'locAdded': int(grp['loc_added'].sum()),
+            'totalCodeGen': int(totals['suggestions'].iat[idx]),
+            'totalCodeAccept': int(totals['acceptances'].iat[idx]),
+            'agentUsers': int(agent_users.iat[idx]) if has_agent else 0,
+            'chatUsers': int(chat_users.iat[idx]) if has_chat else 0,
+            'locAdded': int(totals['loc_added'].iat[idx]),
         }
         if dev_users:
-            week_users = {str(u) for u in user_sets_by_week[week]}
-            dev_active = week_users & dev_users
-            dev_rolling = {str(u) for u in rolling_active} & dev_users
-            row['devActiveUsers'] = len(dev_active)
-            row['devRollingActiveUsers'] = len(dev_rolling)
-            row['devCopilotPct'] = round(len(dev_active) / max(len(dev_rolling), 1) * 100, 1)
+            dev_active = int(is_dev[entering].sum())
+            row['devActiveUsers'] = dev_active
+            row['devRollingActiveUsers'] = dev_rolling
+            row['devCopilotPct'] = round(dev_active / max(dev_rolling, 1) * 100, 1)
         weekly_rows.append(row)
 
     # Monthly trend for summary
-    copilot['month'] = copilot['EventDay'].dt.to_period('M')
-    monthly = copilot.groupby('month')['user_id'].nunique()
+    monthly = copilot.groupby(copilot['EventDay'].dt.to_period('M'))['user_id'].nunique()
     first_month_users = monthly.iloc[0] if len(monthly) > 0 else 0
     last_month_users = monthly.iloc[-1] if len(monthly) > 0 else 0
 
@@ -681,99 +1451,48 @@ def compute_copilot_adoption(copilot_path):
         'adoptionTrend': f"{first_month_users} → {last_month_users} monthly users",
         'weekly': weekly_rows,
     }
-    return adoption, copilot, fmt
+    return adoption
 
 
-def compute_copilot_pr_correlation(prs, copilot_df):
+def compute_copilot_pr_correlation(tickets, ticket_authors):
     """Correlate Copilot usage with specific PRs using AuthorUUID + week overlap.
 
-    For each PR, checks if the author had Copilot activity during the same week
-    as the PR's completion (PREnd). Week-level matching is used because PRs often
-    span only 1-2 days and strict day-range overlap misses most usage.
-    Also sums copilot suggestions for the author during the PR's week.
+    ``tickets`` is the ticket_view of a fact table built with AuthorUUID-keyed
+    telemetry: a PR counts as Copilot-assisted when its author had Copilot
+    activity during the same week as the PR's completion (PREnd), and a
+    ticket when any of its PRs was. Week-level matching is used because PRs
+    often span only 1-2 days and strict day-range overlap misses most usage.
+    TotalSuggestions sums the author's suggestions for each PR's week.
     """
     mature_start_ts = pd.Timestamp(MATURE_START)
 
-    # reset_index is load-bearing: merge() below returns a fresh RangeIndex,
-    # and the assignments back onto `prs` align by index label. Upstream drops
-    # (null-key rows, partial-week rows) leave `prs` with a gappy index, so
-    # without the reset the merged suggestion counts land on the wrong PRs
-    # and scramble the assisted/non-assisted classification.
-    prs = prs.reset_index(drop=True)
-    prs['PREnd'] = pd.to_datetime(prs['PREnd']).dt.normalize()
-    # Mon-Sun ISO calendar week (must match aggregate_to_tickets).
-    prs['WeekEnding'] = prs['PREnd'].dt.to_period('W-SUN').dt.end_time.dt.normalize()
-
-    # Build set of (AuthorUUID, WeekEnding) pairs with copilot activity
-    copilot_weekly = copilot_df.groupby(['user_id', 'week']).agg(
-        suggestions=('suggestions', 'sum'),
-        acceptances=('acceptances', 'sum'),
-    ).reset_index()
-
-    # Merge PRs with copilot weekly data on AuthorUUID + week
-    merged = prs.merge(
-        copilot_weekly,
-        left_on=['AuthorUUID', 'WeekEnding'],
-        right_on=['user_id', 'week'],
-        how='left',
-        suffixes=('', '_copilot'),
-    )
-    prs['copilot_suggestions'] = merged['suggestions'].fillna(0)
-    prs['copilot_acceptances'] = merged['acceptances'].fillna(0)
-    prs['copilot_assisted'] = (prs['copilot_suggestions'] > 0).astype(int)
-
-    # Aggregate to ticket level
-    def agg_ticket(g):
-        return pd.Series({
-            'PREnd': g['PREnd'].max(),
-            'AuthorUUIDs': ','.join(g['AuthorUUID'].unique().astype(str)),
-            'TotalLines': g['PRLines'].sum(),
-            'MaxFiles': g['PRFiles'].max(),
-            'TotalQAChurnLines': g['QAChurnLines'].sum() if 'QAChurnLines' in g.columns else 0,
-            'CopilotAssisted': int(g['copilot_assisted'].any()),
-            'TotalSuggestions': g['copilot_suggestions'].sum(),
-            'TotalAcceptances': g['copilot_acceptances'].sum(),
-        })
-
-    tickets = prs.groupby('JiraTicket').apply(agg_ticket).reset_index()
-    tickets['PREndDate'] = pd.to_datetime(tickets['PREnd']).dt.normalize()
-    # Mon-Sun ISO calendar week, indexed by the Sunday end-of-week date.
-    tickets['WeekEnding'] = tickets['PREndDate'].dt.to_period('W-SUN').dt.end_time.dt.normalize()
-    tickets['HasQAChurn'] = (tickets['TotalQAChurnLines'] > 0).astype(int)
-
     # Focus on mature period for the comparison
     mature = tickets[tickets['PREndDate'] >= mature_start_ts]
     assisted = mature[mature['CopilotAssisted'] == 1]
     non_assisted = mature[mature['CopilotAssisted'] == 0]
 
-    # Weekly comparison
-    all_weeks = sorted(mature['WeekEnding'].unique())
+    # Weekly comparison: ticket and QA-ticket counts per (week, assisted), one
+    # grouped pass; weeks with tickets on only one side get 0 on the other.
+    grid = pd.MultiIndex.from_product([sorted(mature['WeekEnding'].unique()), [1, 0]],
+                                      names=['WeekEnding', 'CopilotAssisted'])
+    by_week = mature.groupby(['WeekEnding', 'CopilotAssisted'])['HasQAChurn'].agg(['size', 'sum']) \
+        .reindex(grid, fill_value=0)
+    by_week['authors'] = count_authors(mature, ticket_authors, ['WeekEnding', 'CopilotAssisted']) \
+        .reindex(grid, fill_value=0)
+    # Rows alternate assisted / non-assisted for each week.
+    n, qa, authors = (by_week[c].astype(int).to_numpy().reshape(-1, 2).tolist()
+                      for c in ('size', 'sum', 'authors'))
     weekly_comparison = []
-    for week in all_weeks:
-        wk = mature[mature['WeekEnding'] == week]
-        wk_a = wk[wk['CopilotAssisted'] == 1]
-        wk_na = wk[wk['CopilotAssisted'] == 0]
-
-        a_authors = set()
-        for uuids_str in wk_a['AuthorUUIDs']:
-            a_authors.update(str(uuids_str).split(','))
-        na_authors = set()
-        for uuids_str in wk_na['AuthorUUIDs']:
-            na_authors.update(str(uuids_str).split(','))
-
-        a_prod = len(wk_a) / (max(len(a_authors), 1) * WORKDAYS_PER_WEEK) if len(wk_a) > 0 else None
-        na_prod = len(wk_na) / (max(len(na_authors), 1) * WORKDAYS_PER_WEEK) if len(wk_na) > 0 else None
-        a_qa = wk_a['HasQAChurn'].sum() / len(wk_a) if len(wk_a) > 0 else None
-        na_qa = wk_na['HasQAChurn'].sum() / len(wk_na) if len(wk_na) > 0 else None
-
+    for week, (n_a, n_na), (qa_a, qa_na), (a_authors, na_authors) in zip(
+            grid.levels[0], n, qa, authors):
         weekly_comparison.append({
             'week': pd.Timestamp(week).strftime('%Y-%m-%d'),
-            'assistedTickets': int(len(wk_a)),
-            'nonAssistedTickets': int(len(wk_na)),
-            'assistedProductivity': a_prod,
-            'nonAssistedProductivity': na_prod,
-            'assistedQARate': a_qa,
-            'nonAssistedQARate': na_qa,
+            'assistedTickets': n_a,
+            'nonAssistedTickets': n_na,
+            'assistedProductivity': n_a / (max(a_authors, 1) * WORKDAYS_PER_WEEK) if n_a else None,
+            'nonAssistedProductivity': n_na / (max(na_authors, 1) * WORKDAYS_PER_WEEK) if n_na else None,
+            'assistedQARate': qa_a / n_a if n_a else None,
+            'nonAssistedQARate': qa_na / n_na if n_na else None,
         })
 
     # Overall summary for mature period
@@ -789,34 +1508,29 @@ def compute_copilot_pr_correlation(prs, copilot_df):
     prod_lift = ((avg_a_prod - avg_na_prod) / avg_na_prod * 100) if avg_na_prod > 0 else 0
     qa_delta = ((a_qa_overall - na_qa_overall) / na_qa_overall * 100) if na_qa_overall > 0 else 0
 
-    # Copilot intensity buckets (by total suggestions on the ticket)
-    def intensity_bucket(row):
-        s = row['TotalSuggestions']
-        if s == 0:
-            return 'none'
-        elif s <= 10:
-            return 'low'
-        elif s <= 50:
-            return 'medium'
-        else:
-            return 'high'
-
-    mature = mature.copy()
-    mature['IntensityBucket'] = mature.apply(intensity_bucket, axis=1)
+    # Copilot intensity buckets by total suggestions on the ticket: 0 is
+    # 'none', then (0, 10], (10, 50], and everything above is 'high'.
+    mature = mature.assign(IntensityBucket=np.asarray(INTENSITY_LABELS, dtype=object)[
+        np.searchsorted(INTENSITY_CUTS, mature['TotalSuggestions'].to_numpy(dtype=float), side='left')])
+    bucket_authors = count_authors(mature, ticket_authors, ['IntensityBucket'])
+    buckets = mature.groupby('IntensityBucket').agg(
+        tickets=('JiraTicket', 'size'),
+        qaTickets=('HasQAChurn', 'sum'),
+        weeks=('WeekEnding', 'nunique'),
+        suggestions=('TotalSuggestions', 'sum'),
+    )
     intensity = {}
-    for bucket in ['low', 'medium', 'high']:
-        b = mature[mature['IntensityBucket'] == bucket]
-        if len(b) > 0:
-            b_authors = set()
-            for uuids_str in b['AuthorUUIDs']:
-                b_authors.update(str(uuids_str).split(','))
-            b_weeks = len(b['WeekEnding'].unique())
-            b_fte_days = max(len(b_authors), 1) * max(b_weeks, 1) * WORKDAYS_PER_WEEK
+    for bucket in INTENSITY_LABELS[1:]:
+        if bucket in buckets.index:
+            b = buckets.loc[bucket]
+            n = int(b['tickets'])
+            b_authors = int(bucket_authors.get(bucket, 0))
+            b_fte_days = max(b_authors, 1) * max(int(b['weeks']), 1) * WORKDAYS_PER_WEEK
             intensity[bucket] = {
-                'tickets': int(len(b)),
-                'productivity': round(len(b) / b_fte_days, 4) if b_fte_days > 0 else 0,
-                'qaChurn': round(b['HasQAChurn'].sum() / len(b), 4),
-                'avgSuggestions': round(b['TotalSuggestions'].mean(), 1),
+                'tickets': n,
+                'productivity': round(n / b_fte_days, 4) if b_fte_days > 0 else 0,
+                'qaChurn': round(np.float64(b['qaTickets']) / n, 4),
+                'avgSuggestions': round(np.float64(b['suggestions']) / n, 1),
             }
         else:
             intensity[bucket] = {'tickets': 0, 'productivity': 0, 'qaChurn': 0, 'avgSuggestions': 0}
@@ -836,7 +1550,7 @@ def compute_copilot_pr_correlation(prs, copilot_df):
     }
 
 
-def compute_per_user_metrics(prs, copilot_df):
+def compute_per_user_metrics(facts, copilot_df, identities=None, calendar=None):
     """Per-developer productivity + Copilot adoption, keyed by AuthorUUID.
 
     Returns (per_user, uuid_map):
@@ -849,134 +1563,109 @@ def compute_per_user_metrics(prs, copilot_df):
 
     Productivity reuses the team definition (distinct tickets / FTE-day); a
     ticket touched by N authors is credited to each of them. Adoption reuses the
-    intensity-tier cutoffs from ``compute_copilot_adoption``.
+    intensity-tier cutoffs from ``compute_copilot_adoption``. Department and
+    email come from ``identities`` (resolve_identities; resolved here if omitted),
+    week labels and phases from ``calendar`` (week_calendar; likewise).
+    PR activity comes from the fact table (build_fact_table).
     """
-    baseline_end_ts = pd.Timestamp(BASELINE_END)
-    mature_start_ts = pd.Timestamp(MATURE_START)
-
-    def get_phase(week_ts):
-        if week_ts < baseline_end_ts:
-            return 'baseline'
-        if week_ts < mature_start_ts:
-            return 'transition'
-        return 'mature'
-
-    # ── Per-user productivity from PRs, aggregated to author-ticket level ──
-    pr = prs.copy()
-    pr['PREnd'] = pd.to_datetime(pr['PREnd']).dt.normalize()
-    pr['week'] = pr['PREnd'].dt.to_period('W-SUN').dt.end_time.dt.normalize()
-    qa_col = 'QAChurnLines' if 'QAChurnLines' in pr.columns else None
-    lines_col = 'PRLines' if 'PRLines' in pr.columns else None
-    author_tickets = pr.groupby(['AuthorUUID', 'JiraTicket']).agg(
-        week=('week', 'max'),
-        lines=(lines_col, 'sum') if lines_col else ('JiraTicket', 'size'),
-        qa=(qa_col, lambda s: int(s.fillna(0).sum() > 0)) if qa_col else ('JiraTicket', lambda s: 0),
+    # ── Per-user productivity, aggregated to author-ticket level ──
+    # A ticket lands in the author's week of their last PR on it, and is a QA
+    # ticket for them when their own PRs on it drew QA churn.
+    qa_col = 'QAChurnLines' if 'QAChurnLines' in facts.columns else None
+    author_tickets = facts.groupby(['AuthorUUID', 'JiraTicket'], observed=True).agg(
+        week=('PRWeek', 'max'),
+        qa=(qa_col, 'sum') if qa_col else ('PRCount', 'size'),
     ).reset_index()
-    auw = author_tickets.groupby(['AuthorUUID', 'week']).agg(
+    author_tickets['qa'] = (author_tickets['qa'] > 0).astype(int) if qa_col else 0
+    auw = author_tickets.groupby(['AuthorUUID', 'week'], observed=True).agg(
         tickets=('JiraTicket', 'nunique'),
         qaTickets=('qa', 'sum'),
-        lines=('lines', 'sum'),
     ).reset_index()
 
     # ── Per-user Copilot adoption from telemetry ──
     if copilot_df is not None and len(copilot_df) > 0:
-        cu = copilot_df.groupby(['user_id', 'week']).agg(
+        user_ids = _user_key(copilot_df['user_id'])
+        cu = copilot_df.groupby([user_ids, 'week'], observed=True).agg(
             suggestions=('suggestions', 'sum'),
             acceptances=('acceptances', 'sum'),
             locAdded=('loc_added', 'sum'),
             activeDays=('EventDay', 'nunique'),
         ).reset_index()
-        user_days = copilot_df.groupby('user_id')['EventDay'].nunique()
+        user_days = copilot_df.groupby(user_ids, observed=True)['EventDay'].nunique()
     else:
         cu = pd.DataFrame(columns=['user_id', 'week', 'suggestions', 'acceptances', 'locAdded', 'activeDays'])
         user_days = pd.Series(dtype=int)
 
-    users = sorted(set(auw['AuthorUUID'].astype(str)) | set(cu['user_id'].astype(str)))
-
-    # Department per user: modal Department from PR rows, falling back to
-    # AI-telemetry rows for users who never authored a PR. Older exports
-    # without the column simply leave department as None.
-    dept_map = {}
-
-    def _fill_dept(df, id_col):
-        if df is None or 'Department' not in getattr(df, 'columns', []):
-            return
-        for uid, grp in df.groupby(df[id_col].astype(str)):
-            if uid in dept_map:
-                continue
-            m = grp['Department'].dropna().mode()
-            if len(m):
-                dept_map[uid] = str(m.iloc[0])
-
-    _fill_dept(pr, 'AuthorUUID')
-    _fill_dept(copilot_df, 'user_id')
-
-    # Email per user: modal Email from PR rows, falling back to AI-telemetry
-    # rows. Only the local part (before "@") is shipped — enough to identify
-    # the user without publishing full addresses.
-    email_map = {}
-
-    def _fill_email(df, id_col):
-        if df is None or 'Email' not in getattr(df, 'columns', []):
-            return
-        for uid, grp in df.groupby(df[id_col].astype(str)):
-            if uid in email_map:
-                continue
-            m = grp['Email'].dropna().mode()
-            if len(m):
-                email_map[uid] = str(m.iloc[0]).split('@')[0].strip()
-
-    _fill_email(pr, 'AuthorUUID')
-    _fill_email(copilot_df, 'user_id')
+    if identities is None:
+        identities = resolve_identities(facts, copilot_df)
+    dept_map = identities['department'].dropna().to_dict()
+    email_map = identities['email'].dropna().to_dict()
+
+    # ── Dense user × week panel: outer join of PR and telemetry aggregates ──
+    # Every (user, week) with either tickets or Copilot activity gets one row;
+    # the weekly drill-down and the phase summaries are both read off it.
+    counts = ['tickets', 'qaTickets', 'suggestions', 'acceptances', 'locAdded']
+    panel = pd.merge(
+        auw.assign(uuid=_user_key(auw['AuthorUUID']))[['uuid', 'week', 'tickets', 'qaTickets']],
+        cu.rename(columns={'user_id': 'uuid'})[['uuid', 'week', 'suggestions', 'acceptances', 'locAdded']],
+        on=['uuid', 'week'],
+        how='outer',
+    )
+    panel[counts] = panel[counts].fillna(0).astype(int)
+    panel = panel.sort_values(['uuid', 'week'], kind='stable').reset_index(drop=True)
+    if calendar is None:
+        calendar = week_calendar(panel['week'])
+    panel['phase'] = week_lookup(calendar, panel['week'], 'phase')
+    panel['copilotActive'] = ((panel['suggestions'] > 0) | (panel['acceptances'] > 0) | (panel['locAdded'] > 0)).astype(int)
+
+    # Phase-split summaries, one grouped sum per user.
+    mature = panel['phase'] == 'mature'
+    baseline = panel['phase'] == 'baseline'
+    shipped = panel['tickets'] > 0
+    per_user_totals = pd.DataFrame({
+        'uuid': panel['uuid'],
+        'matureTickets': panel['tickets'].where(mature, 0),
+        'baselineTickets': panel['tickets'].where(baseline, 0),
+        'matureWeeks': (mature & shipped).astype(int),
+        'baselineWeeks': (baseline & shipped).astype(int),
+        'maturePresentWeeks': (mature & (shipped | (panel['copilotActive'] > 0))).astype(int),
+        'matureCopilotWeeks': (mature & (panel['copilotActive'] > 0)).astype(int),
+        'matureSuggestions': panel['suggestions'].where(mature, 0),
+        'matureAcceptances': panel['acceptances'].where(mature, 0),
+    }).groupby('uuid', sort=True, observed=True).sum()
+
+    weekly_rows = [
+        {
+            'week': week,
+            'phase': phase,
+            'tickets': tickets,
+            'productivity': round(tickets / WORKDAYS_PER_WEEK, 4),
+            'qaTickets': qa_tix,
+            'copilotActive': cop_active,
+            'suggestions': sugg,
+            'acceptances': acc,
+            'acceptanceRate': round(acc / sugg, 4) if sugg > 0 else None,
+            'locAdded': loc,
+        }
+        for week, phase, tickets, qa_tix, cop_active, sugg, acc, loc in zip(
+            week_lookup(calendar, panel['week'], 'label'), panel['phase'], panel['tickets'].tolist(),
+            panel['qaTickets'].tolist(), panel['copilotActive'].tolist(), panel['suggestions'].tolist(),
+            panel['acceptances'].tolist(), panel['locAdded'].tolist(),
+        )
+    ]
+    # Panel rows are sorted by uuid, so each user's weeks are one contiguous slice.
+    bounds = np.cumsum([0] + panel.groupby('uuid', sort=True, observed=True).size().tolist())
 
     ranking = []
-    for uuid in users:
-        u_prod = auw[auw['AuthorUUID'].astype(str) == uuid].set_index('week')
-        u_cop = cu[cu['user_id'].astype(str) == uuid].set_index('week') if len(cu) else cu
-        weeks = sorted(set(u_prod.index) | (set(u_cop.index) if len(u_cop) else set()))
-
-        weekly = []
-        mature_tickets = baseline_tickets = 0
-        mature_weeks = baseline_weeks = 0
-        sum_sugg = sum_acc = 0
-        cop_active_weeks_mature = mature_present_weeks = 0
-
-        for w in weeks:
-            phase = get_phase(pd.Timestamp(w))
-            tickets = int(u_prod.loc[w, 'tickets']) if w in u_prod.index else 0
-            qa_tix = int(u_prod.loc[w, 'qaTickets']) if w in u_prod.index else 0
-            prod = tickets / WORKDAYS_PER_WEEK
-            in_cop = len(u_cop) and w in u_cop.index
-            sugg = int(u_cop.loc[w, 'suggestions']) if in_cop else 0
-            acc = int(u_cop.loc[w, 'acceptances']) if in_cop else 0
-            loc = int(u_cop.loc[w, 'locAdded']) if in_cop else 0
-            cop_active = 1 if (sugg > 0 or acc > 0 or loc > 0) else 0
-            weekly.append({
-                'week': pd.Timestamp(w).strftime('%Y-%m-%d'),
-                'phase': phase,
-                'tickets': tickets,
-                'productivity': round(prod, 4),
-                'qaTickets': qa_tix,
-                'copilotActive': cop_active,
-                'suggestions': sugg,
-                'acceptances': acc,
-                'acceptanceRate': round(acc / sugg, 4) if sugg > 0 else None,
-                'locAdded': loc,
-            })
-            if phase == 'mature':
-                mature_tickets += tickets
-                sum_sugg += sugg
-                sum_acc += acc
-                if tickets > 0:
-                    mature_weeks += 1
-                if tickets > 0 or cop_active:
-                    mature_present_weeks += 1
-                if cop_active:
-                    cop_active_weeks_mature += 1
-            elif phase == 'baseline':
-                baseline_tickets += tickets
-                if tickets > 0:
-                    baseline_weeks += 1
+    for i, (uuid, t) in enumerate(per_user_totals.iterrows()):
+        weekly = weekly_rows[bounds[i]:bounds[i + 1]]
+        mature_tickets = int(t['matureTickets'])
+        baseline_tickets = int(t['baselineTickets'])
+        mature_weeks = int(t['matureWeeks'])
+        baseline_weeks = int(t['baselineWeeks'])
+        mature_present_weeks = int(t['maturePresentWeeks'])
+        sum_sugg = int(t['matureSuggestions'])
+        sum_acc = int(t['matureAcceptances'])
 
         mat_prod = round(mature_tickets / (mature_weeks * WORKDAYS_PER_WEEK), 4) if mature_weeks else 0.0
         base_prod = round(baseline_tickets / (baseline_weeks * WORKDAYS_PER_WEEK), 4) if baseline_weeks else 0.0
@@ -989,7 +1678,7 @@ def compute_per_user_metrics(prs, copilot_df):
             'baselineProductivity': base_prod,
             'prodVsBaseline': _fmt_delta(mat_prod, base_prod),
             # Adoption % = share of active mature weeks where the dev used Copilot.
-            'adoptionPct': round(cop_active_weeks_mature / mature_present_weeks * 100, 1) if mature_present_weeks else 0.0,
+            'adoptionPct': round(int(t['matureCopilotWeeks']) / mature_present_weeks * 100, 1) if mature_present_weeks else 0.0,
             'acceptanceRate': round(sum_acc / sum_sugg * 100, 1) if sum_sugg else None,
             'activeDays': days,
             'intensityTier': tier,
@@ -1016,6 +1705,226 @@ def compute_per_user_metrics(prs, copilot_df):
     return per_user, uuid_map
 
 
+def _state_config():
+    """Constants the stored ticket frames depend on; a change invalidates the state."""
+    return {
+        'baselineEnd': BASELINE_END,
+        'matureStart': MATURE_START,
+        'workdaysPerWeek': WORKDAYS_PER_WEEK,
+        'minTicketsThreshold': MIN_TICKETS_THRESHOLD,
+        'sizeCuts': SIZE_CUTS,
+        'filesCuts': FILES_CUTS,
+    }
+
+
+STATE_FRAMES = ('prs', 'tickets', 'ticket_authors', 'weekly', 'sc_cube', 'copilot')
+
+
+def load_state(state_dir):
+    """Load the incremental-refresh state from ``state_dir``.
+
+    The state holds every complete-week PR and telemetry row ingested so far
+    plus the week-keyed frames derived from them (tickets, ticket-author
+    bridge, weekly team metrics, size × complexity cube). ``meta.json`` is
+    written last and carries the watermarks — the Sunday of the newest
+    complete week already ingested from each source.
+
+    Returns None when there is no usable state (first run, or the bucketing /
+    phase constants changed since it was written), in which case the caller
+    does a full build and seeds a fresh state.
+    """
+    state_dir = Path(state_dir)
+    meta_path = state_dir / 'meta.json'
+    if not meta_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text(encoding='utf-8'))
+    if meta.get('config') != _state_config():
+        print(f"load_state: config changed since {state_dir} was written; rebuilding from scratch")
+        return None
+    state = {'meta': meta}
+    for name in STATE_FRAMES:
+        path = state_dir / f'{name}.pkl'
+        state[name] = pd.read_pickle(path) if path.exists() else None
+    return state
+
+
+def save_state(state_dir, state):
+    """Persist the incremental-refresh state (frames first, meta.json last).
+
+    Every file is written under a temporary name and renamed into place, so
+    a run killed mid-save leaves whole files behind. Before replacing any
+    frame the old meta.json is removed: an interrupted save then reads as
+    "no state" (a full rebuild), never as old watermarks over new frames.
+    """
+    state_dir = Path(state_dir)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    (state_dir / 'meta.json').unlink(missing_ok=True)
+    for name in STATE_FRAMES:
+        path = state_dir / f'{name}.pkl'
+        if state.get(name) is not None:
+            tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+            state[name].to_pickle(tmp)
+            os.replace(tmp, path)
+        elif path.exists():
+            path.unlink()
+
+    def watermark(df, col):
+        return df[col].max().strftime('%Y-%m-%d') if df is not None and len(df) else None
+
+    meta = {
+        'config': _state_config(),
+        'prWatermark': watermark(state['weekly'], 'WeekEnding'),
+        'copilotWatermark': watermark(state.get('copilot'), 'week'),
+        'copilotFormat': state.get('copilot_fmt'),
+        'updated': datetime.now().strftime('%Y-%m-%d %H:%M'),
+    }
+    tmp = state_dir / f'meta.{os.getpid()}.tmp'
+    tmp.write_text(json.dumps(meta, indent=2), encoding='utf-8')
+    os.replace(tmp, state_dir / 'meta.json')
+
+
+def _splice_weeks(stored, fresh, weeks):
+    """Replace the rows of ``stored`` that fall in ``weeks`` with ``fresh``.
+
+    Works on both week-keyed layouts: the weekly frame (WeekEnding column)
+    and the size × complexity cube (WeekEnding index level, whose bucket
+    order within a week must be preserved).
+    """
+    if isinstance(stored.index, pd.MultiIndex):
+        kept = stored[~stored.index.get_level_values('WeekEnding').isin(weeks)]
+        merged = pd.concat([kept, fresh])
+        order = np.argsort(merged.index.get_level_values('WeekEnding'), kind='stable')
+        return merged.iloc[order]
+    kept = stored[~stored['WeekEnding'].isin(weeks)]
+    return pd.concat([kept, fresh]).sort_values('WeekEnding', kind='stable').reset_index(drop=True)
+
+
+def verify_state(state, prs):
+    """``state``, or None when the export restates history already ingested into it.
+
+    ingest_prs reads only the weeks after the watermark, so PR rows an export
+    adds to (or drops from) older weeks would never reach the dashboard, and
+    the baseline would drift from a full build. The export's PR count up to
+    the watermark must match the stored one, and it must bring no column the
+    stored rows lack (an Email column added to old rows, say); otherwise a
+    warning is printed and None is returned, so the refresh rebuilds from the
+    whole export and reseeds the state.
+    """
+    watermark = state and state['meta'].get('prWatermark')
+    if not watermark:
+        return state
+    watermark = pd.Timestamp(watermark)
+
+    def pr_count(df):
+        ingested = df[week_ending(pd.to_datetime(df['PREnd'])) <= watermark]
+        return int(ingested['PRCount'].fillna(1).sum()) if 'PRCount' in ingested.columns else len(ingested)
+
+    exported, stored = pr_count(prs), pr_count(state['prs'])
+    added = sorted(set(prs.columns) - set(state['prs'].columns))
+    if exported == stored and not added:
+        return state
+    print("=" * 72)
+    if added:
+        print(f"WARNING: RESTATED HISTORY — the export adds column(s) {', '.join(added)} to the")
+        print(f"  PR rows the incremental state already holds (weeks up to {watermark:%Y-%m-%d}).")
+    else:
+        print(f"WARNING: RESTATED HISTORY — the export has {exported} PRs in the weeks up to")
+        print(f"  {watermark:%Y-%m-%d}, the incremental state {stored}. Rows were added to or removed")
+        print("  from weeks already ingested.")
+    print("  This refresh rebuilds from the whole export and reseeds the state.")
+    print("=" * 72)
+    return None
+
+
+def ingest_prs(state, prs):
+    """Fold the PR rows newer than the stored watermark into the state.
+
+    ``prs`` is the full (partial-week-filtered) export; only rows whose
+    Mon-Sun week ends after ``meta['prWatermark']`` are ingested. Because the
+    watermark is the newest *complete* week, a trailing week that was hidden
+    as partial on the previous run is picked up here once it has completed.
+    Rows back-dated into weeks at or before the watermark are not picked up;
+    verify_state has already sent a restated export to a full rebuild.
+
+    Returns (all_prs, changed): every stored and new PR row, and the tickets
+    the new rows touch (see ingest_weeks). Updates ``state['prs']`` in place.
+    """
+    watermark = state['meta'].get('prWatermark')
+    week = week_ending(pd.to_datetime(prs['PREnd']))
+    new = prs[week > pd.Timestamp(watermark)] if watermark else prs
+    print(f"ingest_prs: {len(new)} new PR rows after watermark {watermark}")
+
+    all_prs = pd.concat([state['prs'], new], ignore_index=True) if len(new) else state['prs']
+    if 'PRCount' in all_prs.columns:
+        all_prs['PRCount'] = all_prs['PRCount'].fillna(1)
+    state['prs'] = all_prs
+    return all_prs, new['JiraTicket'].unique()
+
+
+def ingest_weeks(state, changed, tickets):
+    """The weeks an incremental refresh recomputes: those the ``changed`` tickets (ingest_prs) touch.
+
+    ``tickets`` is the ticket view of the full fact table. A new PR on an
+    existing ticket can move that ticket to a later week, so the affected
+    weeks are the stored and current weeks of every touched ticket. Only
+    those weeks of the weekly metrics and the size × complexity cube are
+    recomputed (see _weekly_frame); everything else is reused.
+    """
+    if not len(changed):
+        return pd.DatetimeIndex([])
+    stored = state['tickets']
+    affected = pd.DatetimeIndex(pd.concat([
+        stored.loc[stored['JiraTicket'].isin(changed), 'WeekEnding'],
+        tickets.loc[tickets['JiraTicket'].isin(changed), 'WeekEnding'],
+    ]).dropna().unique())
+    print(f"ingest_weeks: {len(changed)} tickets touched, {len(affected)} weeks recomputed")
+    return affected
+
+
+def _weekly_frame(name, compute, state, affected, tickets, *args):
+    """State frame ``name`` (weekly / sc_cube) as ``compute(tickets, *args)``.
+
+    With ``affected`` weeks (ingest_weeks) only those are recomputed and
+    spliced into the stored frame; ``affected`` None is a full build.
+    """
+    if affected is None:
+        return compute(tickets, *args)
+    if not len(affected):
+        return state[name]
+    return _splice_weeks(state[name], compute(tickets[tickets['WeekEnding'].isin(affected)], *args), affected)
+
+
+def ingest_copilot(state, copilot, fmt):
+    """Append telemetry rows newer than the stored watermark; returns the full frame.
+
+    Weeks after ``meta['copilotWatermark']`` are appended to the stored rows.
+    A format switch (legacy Copilot_All ↔ AI All) discards the stored rows,
+    and so does an export whose row count up to the watermark differs from
+    the stored one (restated telemetry): the export's rows are used whole.
+    """
+    stored = state.get('copilot')
+    if stored is None or state['meta'].get('copilotFormat') != fmt:
+        stored = None
+    watermark = state['meta'].get('copilotWatermark') if stored is not None else None
+    if watermark:
+        exported = int((copilot['week'] <= pd.Timestamp(watermark)).sum())
+        kept = int((stored['week'] <= pd.Timestamp(watermark)).sum())
+        if exported != kept:
+            print("=" * 72)
+            print(f"WARNING: RESTATED TELEMETRY — the export has {exported} rows in the weeks up to")
+            print(f"  {watermark}, the incremental state {kept}. Using the export's telemetry whole.")
+            print("=" * 72)
+            stored = watermark = None
+    new = copilot[copilot['week'] > pd.Timestamp(watermark)] if watermark else copilot
+    print(f"ingest_copilot: {len(new)} new telemetry rows after watermark {watermark}")
+    if stored is not None and len(new):
+        copilot = pd.concat([stored, new], ignore_index=True)
+    elif stored is not None:
+        copilot = stored
+    state.update(copilot=copilot, copilot_fmt=fmt)
+    return copilot
+
+
 def _sanitize_for_json(obj):
     """Recursively replace NaN/Inf with None so JSON is valid."""
     if obj is None:
@@ -1056,76 +1965,712 @@ def serialize(obj):
     raise TypeError(f"Not serializable: {type(obj)} {obj}")
 
 
-def build_dashboard_data(input_path, sheet_name=None, copilot_path=None):
-    prs = load_prs(input_path, sheet_name)
-    # Cutoff = latest observed PR end date. Reported in the JSON as
-    # `dataCutoff` for context.
-    cutoff = pd.to_datetime(prs['PREnd']).dropna().max().normalize() if 'PREnd' in prs.columns else None
-
-    # Hide the partial trailing week entirely: drop PRs whose Mon-Sun
-    # week_ending is past the observed cutoff. The trailing partial week
-    # never makes it into the weekly scatter, rolling averages,
-    # baseline/mature means, or the monthly rollup.
-    if cutoff is not None:
-        pr_week_end = pd.to_datetime(prs['PREnd']).dt.to_period('W-SUN').dt.end_time.dt.normalize()
-        partial_mask = pr_week_end > cutoff
-        n_partial = int(partial_mask.sum())
-        if n_partial:
-            print(f"build_dashboard_data: hid {n_partial} PR rows in partial trailing week (cutoff {cutoff.strftime('%Y-%m-%d')})")
-        prs = prs[~partial_mask].copy()
-
-    tickets = aggregate_to_tickets(prs)
-    weekly = compute_weekly_team_metrics(tickets)
-    baseline = compute_baseline(tickets, weekly)
-    summary = compute_team_summary(tickets, weekly, baseline)
-    # Weekly per-bucket rows come first: the period summaries (heatmap +
-    # trends baselines) are mean-of-weekly aggregates of these same rows.
-    size_complexity_weekly = compute_size_complexity_weekly(tickets)
-    size_complexity = compute_size_complexity(tickets, size_complexity_weekly)
-    projects = compute_project_metrics(tickets)
-
-    # Copilot adoption data
-    copilot_data = None
-    copilot_df = None
-    copilot_fmt = None
+# ── RUN REPORT ──────────────────────────────────────────────────────────────
+# Collected only between start_run_report() and finish_run_report(); while it
+# is None, run_stage is a plain call.
+_RUN_REPORT = None
+
+
+def _max_rss():
+    """Process peak RSS in bytes so far (None without the resource module)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _frame_rows(obj):
+    """Row count of a stage input/result: a frame, a list, or the first one in a tuple."""
+    if isinstance(obj, tuple):
+        obj = obj[0] if obj else None
+    if isinstance(obj, (pd.DataFrame, pd.Series, list)):
+        return len(obj)
+    return None
+
+
+def start_run_report(trace_memory=False):
+    """Begin collecting per-stage measurements (tracemalloc peaks too if trace_memory)."""
+    global _RUN_REPORT
+    if trace_memory:
+        tracemalloc.start()
+    _RUN_REPORT = {
+        'stages': [],
+        'traceMemory': trace_memory,
+        'wall0': time.perf_counter(),
+        'cpu0': time.process_time(),
+        'started': datetime.now(),
+    }
+
+
+def run_stage(name, fn, *args):
+    """fn(*args), recorded as pipeline stage ``name`` when a run report is active.
+
+    Records wall and CPU seconds (CPU of the calling thread, so stages that
+    overlap in run_graph are not charged for each other; a process stage
+    shows only its wait), the process peak RSS after the stage and how much
+    the stage raised it (shared with overlapping stages), the tracemalloc
+    peak above the stage's starting allocation (with trace_memory), and
+    input/output row counts (the largest frame argument; the first frame or
+    list of the result).
+    """
+    report = _RUN_REPORT
+    if report is None:
+        return fn(*args)
+    rss0 = _max_rss()
+    if report['traceMemory']:
+        tracemalloc.reset_peak()
+        traced0 = tracemalloc.get_traced_memory()[0]
+    wall0, cpu0 = time.perf_counter(), time.thread_time()
+    result = fn(*args)
+    wall, cpu = time.perf_counter() - wall0, time.thread_time() - cpu0
+    rss = _max_rss()
+    rows_in = [n for n in map(_frame_rows, args) if n is not None]
+    report['stages'].append({
+        'stage': name,
+        'startSeconds': round(wall0 - report['wall0'], 4),
+        'wallSeconds': round(wall, 4),
+        'cpuSeconds': round(cpu, 4),
+        'maxRssBytes': rss,
+        'rssGrowthBytes': rss - rss0 if rss is not None else None,
+        'tracedPeakBytes': tracemalloc.get_traced_memory()[1] - traced0 if report['traceMemory'] else None,
+        'rowsIn': max(rows_in) if rows_in else None,
+        'rowsOut': _frame_rows(result),
+    })
+    return result
+
+
+def finish_run_report(path=RUN_REPORT_OUTPUT, prometheus_path=None, **context):
+    """Stop collecting; write the JSON report (and a Prometheus textfile). Returns the report.
+
+    ``context`` (input paths, row totals, ...) is stored alongside the
+    stages. The textfile is replaced atomically, as node_exporter's textfile
+    collector expects.
+    """
+    global _RUN_REPORT
+    report, _RUN_REPORT = _RUN_REPORT, None
+    if report is None:
+        return None
+    if report['traceMemory']:
+        tracemalloc.stop()
+    wall = time.perf_counter() - report['wall0']
+    stages = report['stages']
+    # Stages overlap under run_graph: count each second of stage time once.
+    busy, busy_until = 0.0, 0.0
+    for st in sorted(stages, key=lambda st: st['startSeconds']):
+        end = st['startSeconds'] + st['wallSeconds']
+        busy += max(0.0, end - max(st['startSeconds'], busy_until))
+        busy_until = max(busy_until, end)
+    out = {
+        'generated': report['started'].strftime('%Y-%m-%d %H:%M:%S'),
+        **{k: str(v) if isinstance(v, Path) else v for k, v in context.items()},
+        'wallSeconds': round(wall, 4),
+        'cpuSeconds': round(time.process_time() - report['cpu0'], 4),
+        # Time outside any recorded stage: payload assembly, guards, prints.
+        'otherSeconds': round(wall - busy, 4),
+        'maxRssBytes': _max_rss(),
+        'traceMemory': report['traceMemory'],
+        'keyEncoding': report.get('keyEncoding'),
+        'sectionCache': report.get('sectionCache'),
+        'stages': stages,
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(out, indent=2), encoding='utf-8')
+    if prometheus_path:
+        _write_prometheus_textfile(out, Path(prometheus_path))
+    return out
+
+
+def _write_prometheus_textfile(report, path):
+    stage_metrics = [
+        ('stage_wall_seconds', 'Wall time per stage of the last refresh.', 'wallSeconds'),
+        ('stage_cpu_seconds', 'CPU time per stage of the last refresh.', 'cpuSeconds'),
+        ('stage_rss_growth_bytes', 'Growth of process peak RSS during the stage.', 'rssGrowthBytes'),
+        ('stage_traced_peak_bytes', 'tracemalloc peak above the stage start.', 'tracedPeakBytes'),
+        ('stage_rows_in', 'Input rows of the stage.', 'rowsIn'),
+        ('stage_rows_out', 'Output rows of the stage.', 'rowsOut'),
+    ]
+    started = datetime.strptime(report['generated'], '%Y-%m-%d %H:%M:%S')
+    run_metrics = [
+        ('wall_seconds', 'Wall time of the last refresh.', report['wallSeconds']),
+        ('cpu_seconds', 'CPU time of the last refresh.', report['cpuSeconds']),
+        ('max_rss_bytes', 'Peak RSS of the last refresh.', report['maxRssBytes']),
+        ('last_run_timestamp_seconds', 'Start of the last refresh (Unix time).', round(started.timestamp())),
+        ('key_bytes_raw', 'Memory of the ID columns before dictionary encoding.',
+         (report.get('keyEncoding') or {}).get('beforeBytes')),
+        ('key_bytes_encoded', 'Memory of the ID columns after dictionary encoding.',
+         (report.get('keyEncoding') or {}).get('afterBytes')),
+    ]
+    lines = []
+    for metric, help_text, key in stage_metrics:
+        samples = [(st['stage'], st[key]) for st in report['stages'] if st[key] is not None]
+        if samples:
+            lines += [f'# HELP copilot_refresh_{metric} {help_text}', f'# TYPE copilot_refresh_{metric} gauge']
+            lines += [f'copilot_refresh_{metric}{{stage="{stage}"}} {value}' for stage, value in samples]
+    for metric, help_text, value in run_metrics:
+        if value is not None:
+            lines += [f'# HELP copilot_refresh_{metric} {help_text}', f'# TYPE copilot_refresh_{metric} gauge',
+                      f'copilot_refresh_{metric} {value}']
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    tmp.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    os.replace(tmp, path)
+
+
+# Stage graph (see run_graph). The pandas stages overlap on a thread pool;
+# STAGE_WORKERS = 1 runs every stage in order on the calling thread.
+STAGE_WORKERS = min(4, os.cpu_count() or 1)
+# Stages run in worker processes of their own. None by default: a worker
+# imports this module by name, which a library caller without an
+# ``if __name__ == '__main__'`` guard (or loading it under another name)
+# can't support. main() and the batch runner set it to WORKBOOK_STAGES, the
+# pure-Python xlsx parsing that holds the GIL.
+PROCESS_STAGES = ()
+WORKBOOK_STAGES = ('load_prs', 'load_copilot')
+# Module settings a process stage must see as this process has them (the CLI
+# sets them at run time, and workers import the module afresh).
+PROCESS_SETTINGS = ('XLSX_CACHE_DIR', 'XLSX_PROJECTED', 'WORKBOOK_INDEX')
+
+
+def _run_in_process(settings, fn, *args):
+    """fn(*args) in a worker process, with this module's ``settings`` applied first.
+
+    Returns (result, printed output). The worker does not share the caller's
+    sys.stdout (a batch client's log, say), so the caller replays the output
+    there (_process_result).
+    """
+    globals().update(settings)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+        result = fn(*args)
+    return result, out.getvalue()
+
+
+def _process_result(future):
+    result, output = future.result()
+    sys.stdout.write(output)
+    return result
+
+
+def _process_pool(workers):
+    # Never fork: the pool starts while stage threads may hold locks (pandas,
+    # openpyxl, stdio) that a forked child would inherit held. forkserver
+    # forks from a clean single-threaded server; spawn where there is none.
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def upstream(stages, targets, known=()):
+    """``targets`` and every stage they need, stopping at ``known`` outputs."""
+    needed, todo = set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name in needed or name in known:
+            continue
+        if name not in stages:
+            raise ValueError(f"run_graph: unknown stage {name}")
+        needed.add(name)
+        todo.extend(stages[name][1])
+    return needed
+
+
+def run_graph(stages, inputs=None, workers=None, targets=None):
+    """Run a stage graph; returns every stage output by name.
+
+    ``stages`` maps a stage name to (fn, deps): its output is fn(*outputs of
+    deps), computed once through run_stage and memoized for every stage that
+    depends on it. ``inputs`` seeds outputs that are already known (frames
+    the caller holds instead of a load stage). A stage starts as soon as its
+    inputs are ready, so independent stages overlap on ``workers`` threads
+    (STAGE_WORKERS by default) and the run takes about as long as its
+    critical path; PROCESS_STAGES run in worker processes. With one worker,
+    or while tracing memory (a stage's tracemalloc peak is only its own when
+    it runs alone), stages run one at a time in declaration order.
+
+    With ``targets``, only those stages and the ones they need run; a stage
+    seeded through ``inputs`` is not recomputed, nor is anything only it
+    needs.
+
+    The first stage to raise stops the run: stages not yet started are
+    dropped, running ones finish, and the exception propagates.
+    """
+    outputs = dict(inputs or {})
+    needed = set(stages) if targets is None else upstream(stages, targets, outputs)
+    pending = {name: spec for name, spec in stages.items() if name in needed and name not in outputs}
+    for name, (_, deps) in pending.items():
+        unknown = [d for d in deps if d not in stages and d not in outputs]
+        if unknown:
+            raise ValueError(f"run_graph: stage {name} depends on unknown {', '.join(unknown)}")
+    if workers is None:
+        workers = STAGE_WORKERS
+    if _RUN_REPORT is not None and _RUN_REPORT['traceMemory']:
+        workers = 1
+
+    def ready():
+        return [name for name, (_, deps) in pending.items() if all(d in outputs for d in deps)]
+
+    if workers <= 1:
+        while pending:
+            runnable = ready()
+            if not runnable:
+                raise ValueError(f"run_graph: dependency cycle among {', '.join(pending)}")
+            fn, deps = pending.pop(runnable[0])
+            outputs[runnable[0]] = run_stage(runnable[0], fn, *(outputs[d] for d in deps))
+        return outputs
+
+    in_process = [name for name in pending if name in PROCESS_STAGES]
+    settings = {name: globals()[name] for name in PROCESS_SETTINGS}
+    running = {}
+    with contextlib.ExitStack() as pools:
+        processes = pools.enter_context(_process_pool(len(in_process))) if in_process else None
+        threads = pools.enter_context(ThreadPoolExecutor(max_workers=workers, thread_name_prefix='stage'))
+        try:
+            while pending or running:
+                for name in ready():
+                    fn, deps = pending.pop(name)
+                    args = [outputs[d] for d in deps]
+                    if name in in_process:
+                        # A stage thread waits on the worker and replays its output.
+                        future = processes.submit(_run_in_process, settings, fn, *args)
+                        fn, args = functools.partial(_process_result, future), []
+                    running[threads.submit(run_stage, name, fn, *args)] = name
+                if not running:
+                    raise ValueError(f"run_graph: dependency cycle among {', '.join(pending)}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outputs[running.pop(future)] = future.result()
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
+    return outputs
+
+
+# Section cache (see section_keys). Every SECTION_STAGES output is stored
+# under a key hashed from the exports it derives from, the code of every
+# stage on the way there and the module constants that code reads, so a
+# refresh that only brings new telemetry reuses the PR sections, and an edit
+# to SIZE_CUT recomputes only the size × complexity ones. Entries age out
+# like the sheet cache's; SECTION_CACHE_DIR = None (--no-cache) turns it off.
+SECTION_CACHE_DIR = XLSX_CACHE_DIR / "sections"
+SECTION_STAGES = (
+    'data_range', 'team_size', 'week_calendar', 'compute_weekly_team_metrics', 'compute_baseline',
+    'compute_team_summary', 'compute_size_complexity', 'compute_size_complexity_weekly',
+    'compute_project_metrics', 'compute_copilot_adoption', 'compute_copilot_pr_correlation',
+    'compute_per_user_metrics',
+)
+# Module globals that decide how a run executes rather than what it computes;
+# they never enter a key.
+RUNTIME_GLOBALS = frozenset({
+    'XLSX_CACHE_DIR', 'XLSX_CACHE_MAX_AGE_DAYS', 'XLSX_CACHE_MAX_BYTES', 'XLSX_PROJECTED', 'WORKBOOK_INDEX',
+    'SECTION_CACHE_DIR', 'STAGE_WORKERS', 'PROCESS_STAGES', 'WORKBOOK_STAGES', 'PROCESS_SETTINGS', '_RUN_REPORT',
+    '_WORKBOOK_INDEX',
+})
+# Whole-run fingerprints (see payload_unchanged), one file per output path.
+FINGERPRINT_DIR = OUTPUT_DIR / "fingerprints"
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, default=str).encode('utf-8')).hexdigest()
+
+
+def _code_digest(fn) -> str:
+    """Digest of what ``fn`` computes: its code and the names it looks up, every
+    function of this module it reaches, and the constants (uppercase globals)
+    read on the way.
+
+    Follows partials, closures, nested code objects and module-level names,
+    so editing SIZE_CUT changes the digest of every stage that buckets sizes
+    and of none of the others.
+    """
+    parts, constants, seen = [], {}, set()
+    todo = [fn]
+
+    def constant(value):
+        # Functions inside a constant table (PAYLOAD_FIELDS) count by code, not address.
+        if isinstance(value, types.FunctionType):
+            todo.append(value)
+            return value.__qualname__
+        if isinstance(value, (tuple, list)):
+            return [constant(v) for v in value]
+        return repr(value)
+
+    while todo:
+        obj = todo.pop()
+        if isinstance(obj, functools.partial):
+            todo += [obj.func, *obj.args, *obj.keywords.values()]
+            continue
+        code = getattr(obj, '__code__', obj)
+        if not isinstance(code, types.CodeType):
+            if not callable(obj):
+                parts.append(repr(obj))
+            continue
+        if code in seen:
+            continue
+        seen.add(code)
+        consts = []
+        for c in code.co_consts:
+            if isinstance(c, types.CodeType):
+                todo.append(c)
+            else:
+                consts.append(repr(sorted(c, key=repr)) if isinstance(c, frozenset) else repr(c))
+        # co_names carries the attributes, methods and globals the bytecode looks
+        # up: .mean() and .median() compile to the same co_code.
+        parts.append([code.co_code.hex(), consts, list(code.co_names),
+                      repr(getattr(obj, '__defaults__', None))])
+        for cell in getattr(obj, '__closure__', None) or ():
+            try:
+                todo.append(cell.cell_contents)
+            except ValueError:
+                pass
+        for name in code.co_names:
+            if name in RUNTIME_GLOBALS or name not in globals():
+                continue
+            value = globals()[name]
+            if isinstance(value, types.FunctionType) and value.__module__ == __name__:
+                todo.append(value)
+            elif name.lstrip('_').isupper():
+                constants[name] = constant(value)
+    return _digest(sorted(parts, key=repr), sorted(constants.items()))
+
+
+def section_keys(stages, sources):
+    """Cache key of every stage of a graph, by name (None when unknown).
+
+    ``sources`` identifies the graph's roots by content — export hashes, the
+    stored state — and a stage's key hashes its code (_code_digest), its
+    root identity or the keys of its deps, and the library versions. A stage
+    without a source or stage entry (a frame the caller holds) has no key,
+    and neither has anything downstream of it.
+    """
+    env = (sys.version_info[:3], pd.__version__, np.__version__)
+    keys = {}
+
+    def key(name):
+        if name not in keys:
+            keys[name] = None
+            if name in sources:
+                keys[name] = _digest(env, name, _code_digest(stages[name][0]) if name in stages else None,
+                                     sources[name])
+            elif name in stages:
+                dep_keys = [key(d) for d in stages[name][1]]
+                if all(dep_keys):
+                    keys[name] = _digest(env, name, _code_digest(stages[name][0]), dep_keys)
+        return keys[name]
+
+    for name in (*sources, *stages):
+        key(name)
+    return keys
+
+
+def _section_path(name, key):
+    return SECTION_CACHE_DIR / f"{key[:32]}-{name}.pkl"
+
+
+def load_sections(keys, names=SECTION_STAGES):
+    """Cached outputs of the section stages ``names`` whose key is in the section cache."""
+    if SECTION_CACHE_DIR is None:
+        return {}
+    cached = {}
+    for name in names:
+        if not keys.get(name):
+            continue
+        path = _section_path(name, keys[name])
+        if path.exists():
+            try:
+                cached[name] = pd.read_pickle(path)
+                _touch(path)
+            except Exception:
+                path.unlink(missing_ok=True)
+    return cached
+
+
+def store_sections(keys, outputs):
+    """Write the SECTION_STAGES outputs of a run to the section cache."""
+    if SECTION_CACHE_DIR is None:
+        return
+    SECTION_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for name in SECTION_STAGES:
+        if name not in outputs or not keys.get(name):
+            continue
+        path = _section_path(name, keys[name])
+        if path.exists():
+            continue
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        pd.to_pickle(outputs[name], tmp)
+        os.replace(tmp, path)
+    evict_xlsx_cache(cache_dir=SECTION_CACHE_DIR)
+
+
+def _state_identity(state_dir):
+    """What load_state would read from ``state_dir``: meta.json sans timestamp plus the frames' hashes."""
+    state_dir = Path(state_dir)
+    meta_path = state_dir / 'meta.json'
+    if not meta_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text(encoding='utf-8'))
+    meta.pop('updated', None)
+    frames = {}
+    for name in STATE_FRAMES:
+        path = state_dir / f'{name}.pkl'
+        if path.exists():
+            frames[name] = _sha256(path)
+    return meta, frames
+
+
+def _dashboard_graph(input_path, sheet_name=None, copilot_path=None, state_dir=None, chunksize=None):
+    """(stages, seeded inputs, source identities) of a refresh from export files."""
+    stages = {'load_prs': (functools.partial(load_prs, input_path, sheet_name, chunksize), ())}
+    sources = {'load_prs': (file_digest(input_path), sheet_name, chunksize)}
+    inputs = {}
     if copilot_path:
-        copilot_data, copilot_df, copilot_fmt = compute_copilot_adoption(copilot_path)
-        if copilot_data:
-            summary['copilot_users'] = copilot_data['totalCopilotUsers']
-            summary['copilot_adoption_current'] = copilot_data['weekly'][-1]['copilotPct'] if copilot_data['weekly'] else 0
-
-    # Copilot-PR correlation (only possible with new AuthorUUID-based format)
-    pr_correlation = None
-    if copilot_df is not None and copilot_fmt == 'new':
-        pr_correlation = compute_copilot_pr_correlation(prs, copilot_df)
-
-    # Per-user productivity + adoption, labeled by email local part (with the
-    # alias/UUID kept for stable keys). The alias->UUID map is stashed under a
-    # private key that main() strips before writing the public JSON and
-    # persists to a non-served file.
-    per_user, user_id_map = compute_per_user_metrics(prs, copilot_df)
-
-    # Unique authors across all data
-    all_authors = set()
-    for uuids_str in tickets['AuthorUUIDs']:
-        all_authors.update(str(uuids_str).split(','))
+        stages['load_copilot'] = (functools.partial(_load_copilot_df, copilot_path), ())
+        sources['load_copilot'] = file_digest(copilot_path)
+    else:
+        inputs['load_copilot'] = (None, None)
+        sources['load_copilot'] = None
+    if state_dir:
+        stages['load_state'] = (functools.partial(load_state, state_dir), ())
+        sources['load_state'] = _state_identity(state_dir)
+    else:
+        inputs['load_state'] = None
+        sources['load_state'] = None
+    stages.update(dashboard_stages(state_dir))
+    return stages, inputs, sources
 
-    baseline_end_ts = pd.Timestamp(BASELINE_END)
-    mature_start_ts = pd.Timestamp(MATURE_START)
 
-    def get_phase(week_ts):
-        if week_ts < baseline_end_ts:
-            return 'baseline'
-        elif week_ts < mature_start_ts:
-            return 'transition'
-        else:
-            return 'mature'
+def dashboard_fingerprint(input_path, sheet_name=None, copilot_path=None, state_dir=None, chunksize=None):
+    """Whole-run fingerprint of a refresh: the key of its payload, from file hashes alone.
+
+    Equal fingerprints mean the same exports, state, code and constants, so
+    the same payload (up to ``generated``). The writer counts too: its digest
+    reaches the encoder (_encode_json, _json_scalar), so a change to how the
+    payload is serialized invalidates the fingerprint. No workbook is parsed.
+    """
+    stages, _, sources = _dashboard_graph(input_path, sheet_name, copilot_path, state_dir, chunksize)
+    key = section_keys(stages, sources)['assemble_payload']
+    return key and _digest(key, _code_digest(write_dashboard_json))
+
+
+def build_dashboard_data(input_path, sheet_name=None, copilot_path=None, state_dir=None, chunksize=None):
+    """Build the dashboard payload from a PR export and optional telemetry export.
+
+    With ``state_dir`` the refresh is incremental: only weeks newer than the
+    stored watermarks are ingested (see ingest_prs / ingest_copilot), and the
+    updated state is written back once the payload is built. ``chunksize``
+    streams a CSV PR export out-of-core (see load_prs).
+
+    Runs as a stage graph (dashboard_stages): the telemetry loads while the
+    PR export is loaded and aggregated. Sections whose inputs, code and
+    constants are unchanged come from the section cache, and only the stages
+    the others need are run. Every stage runs in this process unless the
+    caller sets PROCESS_STAGES (as main() does), which needs the module
+    importable as ``refresh_copilot`` and a ``__main__`` guard in the script.
+    """
+    stages, inputs, sources = _dashboard_graph(input_path, sheet_name, copilot_path, state_dir, chunksize)
+    targets = ['assemble_payload'] + (['save_state'] if state_dir else [])
+    return _run_dashboard(stages, inputs, targets, section_keys(stages, sources))['assemble_payload']
 
-    # Build weekly chart data (all weeks — phase-tagged)
+
+def build_dashboard_sections(fields, input_path, sheet_name=None, copilot_path=None, state_dir=None,
+                             chunksize=None):
+    """Only the payload ``fields`` (names in PAYLOAD_FIELDS), by name.
+
+    Runs just the section stages those fields are built from and what they
+    need: ``projects`` alone never loads the telemetry, and nothing computes
+    the Copilot-PR correlation unless it is asked for. The stored state of
+    an incremental refresh is read but not advanced.
+    """
+    stages, inputs, sources = _dashboard_graph(input_path, sheet_name, copilot_path, state_dir, chunksize)
+    targets = sorted({d for field, deps, _ in PAYLOAD_FIELDS if field in fields for d in deps})
+    outputs = _run_dashboard(stages, inputs, targets, section_keys(stages, sources))
+    return payload_fields(outputs, fields)
+
+
+def build_dashboard_payload(prs, copilot_df=None, copilot_fmt=None, state_dir=None):
+    """The dashboard payload from loaded PR rows (load_prs) and telemetry (_load_copilot_df).
+
+    The compute half of build_dashboard_data, for callers that already hold
+    the frames (benchmarks, batch runs over in-memory data). Held frames
+    have no content key, so the section cache is not used.
+    """
+    stages, inputs = {}, {'load_prs': prs, 'load_copilot': (copilot_df, copilot_fmt)}
+    if state_dir:
+        stages['load_state'] = (functools.partial(load_state, state_dir), ())
+    else:
+        inputs['load_state'] = None
+    stages.update(dashboard_stages(state_dir))
+    targets = ['assemble_payload'] + (['save_state'] if state_dir else [])
+    return _run_dashboard(stages, inputs, targets)['assemble_payload']
+
+
+def _run_dashboard(stages, inputs, targets, keys=None):
+    """run_graph over ``targets``, with the section cache when the graph has ``keys``."""
+    cached = {}
+    if keys and SECTION_CACHE_DIR is not None:
+        needed = upstream(stages, targets, inputs)
+        eligible = [name for name in SECTION_STAGES if name in needed and keys.get(name)]
+        cached = load_sections(keys, eligible)
+        print(f"section cache: {len(cached)} of {len(eligible)} sections reused")
+        if _RUN_REPORT is not None:
+            _RUN_REPORT['sectionCache'] = {'reused': sorted(cached),
+                                           'computed': [n for n in eligible if n not in cached]}
+    outputs = run_graph(stages, {**inputs, **cached}, targets=targets)
+    if keys:
+        store_sections(keys, {name: out for name, out in outputs.items() if name not in cached})
+    return outputs
+
+
+def hide_partial_week(prs):
+    """Drop the PRs of the partial trailing week; returns (prs, cutoff).
+
+    Cutoff = latest observed PR end date, reported in the JSON as
+    ``dataCutoff`` for context. PRs whose Mon-Sun week_ending is past it
+    never make it into the weekly scatter, rolling averages, baseline/mature
+    means, or the monthly rollup.
+    """
+    if 'PREnd' not in prs.columns:
+        return prs, None
+    cutoff = pd.to_datetime(prs['PREnd']).dropna().max().normalize()
+    partial_mask = week_ending(pd.to_datetime(prs['PREnd'])) > cutoff
+    n_partial = int(partial_mask.sum())
+    if n_partial:
+        print(f"build_dashboard_data: hid {n_partial} PR rows in partial trailing week (cutoff {cutoff.strftime('%Y-%m-%d')})")
+    return prs[~partial_mask].copy(), cutoff
+
+
+def dashboard_stages(state_dir=None):
+    """The dashboard's stage graph for run_graph; its assemble_payload stage is the payload.
+
+    Starts from the outputs of load_prs (PR rows), load_copilot ((telemetry,
+    format), (None, None) without one) and load_state (None without a
+    usable state). The PR half — partial-week trim, key encoding, fact table,
+    ticket view and the team sections — never waits for the telemetry; the
+    telemetry joins at extend_keys. With ``state_dir`` the updated state is
+    saved once the payload is assembled.
+    """
+    def copilot_only(fn):
+        # Stages that exist only with telemetry: None without one.
+        return lambda copilot, *args: None if copilot is None else fn(copilot, *args)
+
+    stages = {
+        'hide_partial_week': (hide_partial_week, ('load_prs',)),
+        # The stored state, or None (a full rebuild) when the export restates it.
+        'verify_state': (lambda trimmed, state: verify_state(state, trimmed[0]),
+                         ('hide_partial_week', 'load_state')),
+        'encode_keys': (lambda trimmed, state: encode_keys(trimmed[0], None, state)[0],
+                        ('hide_partial_week', 'verify_state')),
+        'ingest_prs': (lambda prs, state: (prs, None) if state is None else ingest_prs(state, prs),
+                       ('encode_keys', 'verify_state')),
+        # Spans the stored PRs too; week_calendar below widens it by the telemetry weeks.
+        'pr_calendar': (lambda prs, ingested: week_calendar(prs['PREnd'], ingested[0]['PREnd']),
+                        ('encode_keys', 'ingest_prs')),
+        'build_fact_table': (lambda ingested: build_fact_table(ingested[0]), ('ingest_prs',)),
+        'ticket_view': (ticket_view, ('build_fact_table',)),
+        'ingest_weeks': (lambda state, ingested, view: None if state is None else ingest_weeks(state, ingested[1], view[0]),
+                         ('verify_state', 'ingest_prs', 'ticket_view')),
+        'compute_weekly_team_metrics': (
+            lambda view, state, affected: _weekly_frame('weekly', compute_weekly_team_metrics, state, affected, *view),
+            ('ticket_view', 'verify_state', 'ingest_weeks')),
+        # Weekly per-bucket rows come first: the period summaries (heatmap +
+        # trends baselines) are mean-of-weekly aggregates of these same rows.
+        'size_buckets': (lambda view: size_buckets(*view), ('ticket_view',)),
+        'build_size_complexity_cube': (
+            lambda view, state, affected, calendar: _weekly_frame('sc_cube', build_size_complexity_cube, state,
+                                                                   affected, *view, calendar),
+            ('size_buckets', 'verify_state', 'ingest_weeks', 'pr_calendar')),
+        'compute_baseline': (lambda view, weekly: compute_baseline(*view, weekly),
+                             ('ticket_view', 'compute_weekly_team_metrics')),
+        'compute_team_summary': (lambda view, weekly, baseline: compute_team_summary(*view, weekly, baseline),
+                                 ('ticket_view', 'compute_weekly_team_metrics', 'compute_baseline')),
+        'compute_size_complexity_weekly': (compute_size_complexity_weekly, ('build_size_complexity_cube',)),
+        'compute_size_complexity': (lambda view, sc_cube: compute_size_complexity(view[0], sc_cube),
+                                    ('size_buckets', 'build_size_complexity_cube')),
+        'compute_project_metrics': (lambda view, calendar: compute_project_metrics(view[0], calendar),
+                                    ('ticket_view', 'pr_calendar')),
+        # Unique authors across all data
+        'team_size': (lambda view: count_authors(*view), ('ticket_view',)),
+        'data_range': (data_range, ('hide_partial_week', 'ingest_prs')),
+
+        # Telemetry half. Department / email resolve from the export's own
+        # telemetry, before any stored rows are folded in.
+        'extend_keys': (lambda facts, copilot, state: (facts, None) if copilot[0] is None
+                        else extend_keys(facts, copilot[0], state),
+                        ('build_fact_table', 'load_copilot', 'verify_state')),
+        'ingest_copilot': (lambda encoded, copilot, state: encoded[1] if state is None or encoded[1] is None
+                           else ingest_copilot(state, encoded[1], copilot[1]),
+                           ('extend_keys', 'load_copilot', 'verify_state')),
+        # One calendar dimension for the rest, spanning both sources (and the
+        # stored rows of an incremental refresh).
+        'week_calendar': (lambda calendar, copilot: calendar if copilot is None
+                          else week_calendar(calendar['WeekEnding'], copilot['EventDay']),
+                          ('pr_calendar', 'ingest_copilot')),
+        'resolve_identities': (lambda encoded: resolve_identities(*encoded), ('extend_keys',)),
+        'compute_copilot_adoption': (copilot_only(compute_copilot_adoption), ('ingest_copilot', 'resolve_identities')),
+        # Copilot-PR correlation (only possible with new AuthorUUID-based format),
+        # from the fact table with the author-week telemetry joined on.
+        'join_copilot': (lambda copilot, encoded, loaded: join_copilot(encoded[0], copilot) if loaded[1] == 'new' else None,
+                         ('ingest_copilot', 'extend_keys', 'load_copilot')),
+        'copilot_ticket_view': (copilot_only(ticket_view), ('join_copilot',)),
+        'compute_copilot_pr_correlation': (copilot_only(lambda view: compute_copilot_pr_correlation(*view)),
+                                           ('copilot_ticket_view',)),
+        # Per-user productivity + adoption, labeled by email local part (with
+        # the alias/UUID kept for stable keys).
+        'compute_per_user_metrics': (
+            lambda encoded, copilot, identities, calendar: compute_per_user_metrics(encoded[0], copilot, identities,
+                                                                                    calendar),
+            ('extend_keys', 'ingest_copilot', 'resolve_identities', 'week_calendar')),
+
+        'assemble_payload': (assemble_payload, SECTION_STAGES),
+    }
+    if state_dir:
+        def save(state, ingested, view, weekly, sc_cube, copilot, loaded, _payload):
+            state = dict(state or {'meta': {}}, prs=ingested[0], tickets=view[0], ticket_authors=view[1],
+                         weekly=weekly, sc_cube=sc_cube)
+            if copilot is not None or 'copilot' not in state:
+                state.update(copilot=copilot, copilot_fmt=loaded[1])
+            save_state(state_dir, state)
+
+        # After assembly: a refresh that fails anywhere leaves the state as it was.
+        stages['save_state'] = (save, ('verify_state', 'ingest_prs', 'ticket_view', 'compute_weekly_team_metrics',
+                                       'build_size_complexity_cube', 'ingest_copilot', 'load_copilot',
+                                       'assemble_payload'))
+    return stages
+
+
+def data_range(trimmed, ingested):
+    """(dataRange, dataCutoff) of the payload: the PR activity span and the partial-week cutoff."""
+    prs, cutoff = ingested[0], trimmed[1]
+    pre_min = prs['FirstPREnd'].fillna(prs['PREnd']).min() if 'FirstPREnd' in prs.columns else prs['PREnd'].min()
+    pre_max = prs['PREnd'].max()
+    return (f"{pd.Timestamp(pre_min).strftime('%Y-%m-%d')} to {pd.Timestamp(pre_max).strftime('%Y-%m-%d')}",
+            cutoff.strftime('%Y-%m-%d') if cutoff is not None else None)
+
+
+def _payload_config(team_size, copilot_data):
+    return {
+        'teamSize': team_size,
+        'workdaysPerWeek': WORKDAYS_PER_WEEK,
+        'totalCopilotUsers': copilot_data['totalCopilotUsers'] if copilot_data else None,
+        'copilotCoveragePct': round(copilot_data['totalCopilotUsers'] / team_size * 100) if copilot_data and team_size > 0 else None,
+    }
+
+
+def _payload_summary(summary, copilot_data):
+    # The stage output is shared; the Copilot totals go on a copy.
+    summary = dict(summary)
+    if copilot_data:
+        summary['copilot_users'] = copilot_data['totalCopilotUsers']
+        summary['copilot_adoption_current'] = copilot_data['weekly'][-1]['copilotPct'] if copilot_data['weekly'] else 0
+    return summary
+
+
+def _payload_weekly(calendar, weekly, copilot_data):
+    """Weekly chart data (all weeks — phase-tagged), joined to the Copilot adoption weeks by week label."""
+    copilot_weeks = {cw['week']: cw for cw in copilot_data['weekly']} if copilot_data else {}
     weekly_chart = []
-    for _, row in weekly.iterrows():
-        week_str = row['WeekEnding'].strftime('%Y-%m-%d')
-        phase = get_phase(row['WeekEnding'])
+    for (_, row), week_str, phase in zip(weekly.iterrows(), week_lookup(calendar, weekly['WeekEnding'], 'label'),
+                                         week_lookup(calendar, weekly['WeekEnding'], 'phase')):
         entry = {
             'week': week_str,
             'phase': phase,
@@ -1141,19 +2686,19 @@ def build_dashboard_data(input_path, sheet_name=None, copilot_path=None):
             'copilotActiveUsers': None,
             'copilotCodeGen': None,
         }
-        # Merge copilot data by matching week
-        if copilot_data:
-            for cw in copilot_data['weekly']:
-                if cw['week'] == week_str:
-                    entry['copilotPct'] = cw['copilotPct']
-                    entry['copilotPctDev'] = cw.get('devCopilotPct')
-                    entry['copilotActiveUsers'] = cw['activeUsers']
-                    entry['copilotCodeGen'] = cw['totalCodeGen']
-                    break
+        cw = copilot_weeks.get(week_str)
+        if cw:
+            entry['copilotPct'] = cw['copilotPct']
+            entry['copilotPctDev'] = cw.get('devCopilotPct')
+            entry['copilotActiveUsers'] = cw['activeUsers']
+            entry['copilotCodeGen'] = cw['totalCodeGen']
         weekly_chart.append(entry)
+    return weekly_chart
+
 
-    # Baseline weekly data (pre-Oct only — for backward compat)
-    pre_weekly = weekly[weekly['WeekEnding'] < baseline_end_ts]
+def _payload_baseline_weekly(weekly):
+    """Baseline weekly data (pre-Oct only — for backward compat)."""
+    pre_weekly = weekly[weekly['WeekEnding'] < pd.Timestamp(BASELINE_END)]
     baseline_weekly = []
     for _, row in pre_weekly.iterrows():
         baseline_weekly.append({
@@ -1163,8 +2708,11 @@ def build_dashboard_data(input_path, sheet_name=None, copilot_path=None):
             'teamQARate': row['TeamQAChurnRate'],
             'lowConfidence': bool(row['LowConfidence']),
         })
+    return baseline_weekly
 
-    # Copilot availability (weekly adoption as the new "availability")
+
+def _payload_availability(copilot_data):
+    """Copilot availability (weekly adoption as the new "availability")."""
     availability = []
     if copilot_data:
         for cw in copilot_data['weekly']:
@@ -1176,57 +2724,386 @@ def build_dashboard_data(input_path, sheet_name=None, copilot_path=None):
                 'code_gen': cw['totalCodeGen'],
                 'loc_added': cw['locAdded'],
             })
+    return availability
+
+
+# Top-level payload fields, in output order: (field, SECTION_STAGES it is
+# built from, builder called with those stage outputs). assemble_payload
+# builds them all; --sections (build_dashboard_sections) only the named ones.
+PAYLOAD_FIELDS = (
+    ('generated', (), lambda: datetime.now().strftime('%Y-%m-%d %H:%M')),
+    ('dataRange', ('data_range',), lambda span: span[0]),
+    ('dataCutoff', ('data_range',), lambda span: span[1]),
+    ('baselineEnd', (), lambda: BASELINE_END),
+    ('matureStart', (), lambda: MATURE_START),
+    ('rollingWindow', (), lambda: ROLLING_WINDOW),
+    ('minTicketsThreshold', (), lambda: MIN_TICKETS_THRESHOLD),
+    ('bucketing', (), lambda: {
+        # Single-cut fields for older readers; null once a grid has more cuts.
+        'sizeCut': SIZE_CUTS[0] if len(SIZE_CUTS) == 1 else None,
+        'filesCut': FILES_CUTS[0] if len(FILES_CUTS) == 1 else None,
+        'sizeCuts': SIZE_CUTS,
+        'filesCuts': FILES_CUTS,
+        'sizeLabels': SIZE_LABELS,
+        'filesLabels': FILES_LABELS,
+    }),
+    ('config', ('team_size', 'compute_copilot_adoption'), _payload_config),
+    ('baseline', ('compute_baseline',), lambda baseline: baseline),
+    ('summary', ('compute_team_summary', 'compute_copilot_adoption'), _payload_summary),
+    ('weekly', ('week_calendar', 'compute_weekly_team_metrics', 'compute_copilot_adoption'), _payload_weekly),
+    ('baselineWeekly', ('compute_weekly_team_metrics',), _payload_baseline_weekly),
+    ('sizeComplexity', ('compute_size_complexity',), lambda size_complexity: size_complexity),
+    ('sizeComplexityWeekly', ('compute_size_complexity_weekly',), lambda weekly: weekly),
+    ('availability', ('compute_copilot_adoption',), _payload_availability),
+    ('copilotAdoption', ('compute_copilot_adoption',), lambda copilot_data: copilot_data),
+    ('copilotPrCorrelation', ('compute_copilot_pr_correlation',), lambda pr_correlation: pr_correlation),
+    ('projects', ('compute_project_metrics',), lambda projects: projects),
+    ('perUser', ('compute_per_user_metrics',), lambda per_user: per_user[0]),
+    # Popped before the public write; see main.
+    ('_userIdMap', ('compute_per_user_metrics',), lambda per_user: per_user[1]),
+)
+
+
+def payload_fields(outputs, fields=None):
+    """The payload ``fields`` (all of PAYLOAD_FIELDS by default) from section stage outputs by name."""
+    return {field: build(*(outputs[d] for d in deps)) for field, deps, build in PAYLOAD_FIELDS
+            if fields is None or field in fields}
+
+
+def assemble_payload(*sections):
+    """The dashboard payload from the SECTION_STAGES outputs of dashboard_stages, in that order."""
+    return payload_fields(dict(zip(SECTION_STAGES, sections)))
+
+
+_INF = float('inf')
+_encode_str = json.encoder.encode_basestring_ascii
+
+
+def _json_scalar(obj):
+    """JSON text for a leaf value, with _sanitize_for_json's coercions applied inline."""
+    t = type(obj)
+    if t is str:
+        return _encode_str(obj)
+    if t is int:
+        return int.__repr__(obj)
+    if t is float:
+        return 'null' if obj != obj or obj == _INF or obj == -_INF else float.__repr__(round(obj, 6))
+    if obj is None:
+        return 'null'
+    if t is bool:
+        return 'true' if obj else 'false'
+    if isinstance(obj, (pd.Timestamp, datetime, date)):
+        return _encode_str(obj.strftime('%Y-%m-%d'))
+    if isinstance(obj, np.integer):
+        return int.__repr__(int(obj))
+    if isinstance(obj, (np.floating, float)):
+        return _json_scalar(float(obj))
+    if isinstance(obj, (np.bool_, bool)):
+        return 'true' if obj else 'false'
+    if isinstance(obj, str):
+        return _encode_str(obj)
+    if isinstance(obj, int):
+        return int.__repr__(obj)
+    return _json_scalar(serialize(obj))
+
+
+def _json_key(key):
+    if isinstance(key, str):
+        return _encode_str(key)
+    if key is True or key is False or key is None:
+        return f'"{json.dumps(key)}"'
+    if isinstance(key, (int, float)):
+        return _encode_str(json.dumps(key))
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+
+def _encode_json(obj, parts, indent, level):
+    """Append obj's JSON to parts in json.dumps' layout (indent=None: compact separators)."""
+    if isinstance(obj, dict):
+        if not obj:
+            parts.append('{}')
+            return
+        if indent is None:
+            sep, colon, close = ',', ':', '}'
+            parts.append('{')
+        else:
+            sep = ',\n' + ' ' * (indent * (level + 1))
+            colon, close = ': ', '\n' + ' ' * (indent * level) + '}'
+            parts.append('{' + sep[1:])
+        first = True
+        for key, value in obj.items():
+            if not first:
+                parts.append(sep)
+            first = False
+            parts.append(_json_key(key))
+            parts.append(colon)
+            if isinstance(value, (dict, list, tuple)):
+                _encode_json(value, parts, indent, level + 1)
+            else:
+                parts.append(_json_scalar(value))
+        parts.append(close)
+    elif isinstance(obj, (list, tuple)):
+        if not obj:
+            parts.append('[]')
+            return
+        if indent is None:
+            sep, close = ',', ']'
+            parts.append('[')
+        else:
+            sep = ',\n' + ' ' * (indent * (level + 1))
+            close = '\n' + ' ' * (indent * level) + ']'
+            parts.append('[' + sep[1:])
+        first = True
+        for value in obj:
+            if not first:
+                parts.append(sep)
+            first = False
+            if isinstance(value, (dict, list, tuple)):
+                _encode_json(value, parts, indent, level + 1)
+            else:
+                parts.append(_json_scalar(value))
+        parts.append(close)
+    else:
+        parts.append(_json_scalar(obj))
 
-    pre_min = prs['PREnd'].min()
-    pre_max = prs['PREnd'].max()
-    data_range = f"{pd.Timestamp(pre_min).strftime('%Y-%m-%d')} to {pd.Timestamp(pre_max).strftime('%Y-%m-%d')}"
 
-    return {
-        'generated': datetime.now().strftime('%Y-%m-%d %H:%M'),
-        'dataRange': data_range,
-        'dataCutoff': cutoff.strftime('%Y-%m-%d') if cutoff is not None else None,
-        'baselineEnd': BASELINE_END,
-        'matureStart': MATURE_START,
-        'rollingWindow': ROLLING_WINDOW,
-        'minTicketsThreshold': MIN_TICKETS_THRESHOLD,
-        'bucketing': {
-            'sizeCut': SIZE_CUT,
-            'filesCut': FILES_CUT,
-            'sizeLabels': SIZE_LABELS,
-            'filesLabels': FILES_LABELS,
-        },
-        'config': {
-            'teamSize': len(all_authors),
-            'workdaysPerWeek': WORKDAYS_PER_WEEK,
-            'totalCopilotUsers': copilot_data['totalCopilotUsers'] if copilot_data else None,
-            'copilotCoveragePct': round(copilot_data['totalCopilotUsers'] / len(all_authors) * 100) if copilot_data and len(all_authors) > 0 else None,
-        },
-        'baseline': baseline,
-        'summary': summary,
-        'weekly': weekly_chart,
-        'baselineWeekly': baseline_weekly,
-        'sizeComplexity': size_complexity,
-        'sizeComplexityWeekly': size_complexity_weekly,
-        'availability': availability,
-        'copilotAdoption': copilot_data,
-        'copilotPrCorrelation': pr_correlation,
-        'projects': projects,
-        'perUser': per_user,
-        '_userIdMap': user_id_map,
+def json_text(obj, indent=2):
+    """Single-pass equivalent of json.dumps(_sanitize_for_json(obj), default=serialize, indent=indent).
+
+    NaN/Inf become null, floats are rounded to 6 places, numpy scalars and
+    timestamps are converted as they are reached — no sanitized copy is built.
+    """
+    parts = []
+    _encode_json(obj, parts, indent, 0)
+    return ''.join(parts)
+
+
+def strip_generated(text: str) -> str:
+    return re.sub(r'"generated": "[^"]*"', '"generated": ""', text, count=1)
+
+
+_GENERATED_BYTES = re.compile(rb'"generated": "[^"]*"')
+
+
+def payload_hash(path):
+    """Content hash of a written payload with its "generated" timestamp blanked (None if absent).
+
+    Read in blocks: "generated" is the payload's first key, so only the first
+    block is rewritten (the whole file is, if the key isn't found there).
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        head = f.read(1 << 20)
+        match = _GENERATED_BYTES.search(head)
+        if not match or match.end() == len(head):
+            head += f.read()
+        digest.update(_GENERATED_BYTES.sub(b'"generated": ""', head, count=1))
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_dashboard_json(data, output_path, indent=2):
+    """Stream the payload to output_path one top-level section (or list item) at a time.
+
+    A rolling SHA-256 is kept over everything but the "generated" value (hashed
+    as ""), the same text payload_hash reads back. If it matches the existing
+    file's hash the new file is discarded and False is returned — the no-op
+    guard. Otherwise the file is replaced atomically and True is returned.
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output_path.with_name(f'.{output_path.name}.{os.getpid()}.tmp')
+    digest = hashlib.sha256()
+    with open(tmp, 'w', encoding='utf-8') as f:
+        def emit(text, hashed=None):
+            f.write(text)
+            digest.update((text if hashed is None else hashed).encode('utf-8'))
+
+        pad, colon = ('', ':') if indent is None else ('\n' + ' ' * indent, ': ')
+        emit('{' if data else '{}')
+        for i, (key, value) in enumerate(data.items()):
+            emit(f"{',' if i else ''}{pad}{_json_key(key)}{colon}")
+            if isinstance(value, list) and value:
+                # Large sections (perUser) are lists; encode them one item at a time.
+                item_pad = '' if indent is None else '\n' + ' ' * (indent * 2)
+                for j, item in enumerate(value):
+                    parts = [',' if j else '[', item_pad]
+                    _encode_json(item, parts, indent, 2)
+                    emit(''.join(parts))
+                emit(']' if indent is None else pad + ']')
+                continue
+            parts = []
+            _encode_json(value, parts, indent, 1)
+            emit(''.join(parts), '""' if key == 'generated' and isinstance(value, str) else None)
+        if data:
+            emit('\n}' if indent is not None else '}')
+    if digest.hexdigest() == payload_hash(output_path):
+        tmp.unlink()
+        return False
+    os.replace(tmp, output_path)
+    return True
+
+
+def _fingerprint_path(output_path):
+    key = hashlib.sha256(str(Path(output_path).resolve()).encode('utf-8')).hexdigest()[:16]
+    return FINGERPRINT_DIR / f"{key}.json"
+
+
+def payload_unchanged(output_path, fingerprint):
+    """True when ``output_path`` still holds the payload of a run with this fingerprint.
+
+    record_fingerprint stores the run fingerprint (dashboard_fingerprint)
+    with the hash of the file it left behind; both must match, so an output
+    edited or restored since then is rebuilt as usual.
+    """
+    path = _fingerprint_path(output_path)
+    if fingerprint is None or not path.exists():
+        return False
+    try:
+        entry = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return False
+    return entry.get('fingerprint') == fingerprint and entry.get('payloadHash') == payload_hash(output_path)
+
+
+def record_fingerprint(output_path, fingerprint):
+    """Remember that ``output_path`` now holds the payload of a run with this fingerprint."""
+    if fingerprint is None:
+        return
+    path = _fingerprint_path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({'output': str(Path(output_path).resolve()), 'fingerprint': fingerprint,
+                                'payloadHash': payload_hash(output_path)}, indent=2), encoding='utf-8')
+
+
+def data_age_days(data):
+    """Days since the last date in the payload's dataRange (None if unparseable)."""
+    range_end_str = str(data.get('dataRange', '')).split(' to ')[-1]
+    try:
+        return (date.today() - datetime.strptime(range_end_str, '%Y-%m-%d').date()).days
+    except ValueError:
+        return None
+
+
+def _write_section(out_dir, rel, obj, previous):
+    """Write one compact section file + compressed siblings; index entry for it.
+
+    Files whose hash matches the previous index are left untouched, so
+    unchanged sections keep their mtimes (and any CDN/browser cache).
+    """
+    raw = json_text(obj, indent=None).encode('utf-8')
+    entry = {'path': rel, 'sha256': hashlib.sha256(raw).hexdigest()[:16], 'bytes': len(raw)}
+    path = out_dir / rel
+    old = previous.get(rel)
+    encodings = {'gz': lambda b: gzip.compress(b, 9, mtime=0)}
+    if HAS_BROTLI:
+        encodings['br'] = lambda b: brotli.compress(b, quality=11)
+    if old and old['sha256'] == entry['sha256'] and path.exists() and \
+            all(path.with_name(path.name + f'.{ext}').exists() for ext in encodings):
+        return old
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(raw)
+    for ext, compress in encodings.items():
+        packed = compress(raw)
+        path.with_name(path.name + f'.{ext}').write_bytes(packed)
+        entry[f'{ext}Bytes'] = len(packed)
+    return entry
+
+
+def write_sectioned_payload(data, out_dir=None):
+    """Split a sanitized payload into per-section files under out_dir (SECTIONS_DIR).
+
+    Layout:
+      meta.json          every scalar top-level field except "generated"
+      <section>.json     one per dict/list top-level field; perUser keeps
+                         each developer's alias/summary but not the weekly array
+      users/Dev-NN.json  the full perUser record, loaded on drill-down
+      index.json         generated timestamp + {path, sha256, bytes, gzBytes,
+                         brBytes} for every file, keyed by path
+
+    "generated" lives only in index.json, so a refresh with no new data leaves
+    every section hash unchanged. Drill-down files for developers no longer in
+    the payload are removed. Returns the index.
+    """
+    out_dir = Path(out_dir or SECTIONS_DIR)
+    index_path = out_dir / 'index.json'
+    previous = {}
+    if index_path.exists():
+        try:
+            previous = json.loads(index_path.read_text(encoding='utf-8')).get('files', {})
+        except ValueError:
+            pass
+
+    meta = {k: v for k, v in data.items() if not isinstance(v, (dict, list)) and k != 'generated'}
+    files = {'meta.json': meta}
+    for key, value in data.items():
+        if key == 'perUser':
+            files['perUser.json'] = [{k: v for k, v in u.items() if k != 'weekly'} for u in value]
+            for u in value:
+                slug = re.sub(r'[^A-Za-z0-9._-]+', '_', str(u['alias']))
+                files[f'users/{slug}.json'] = u
+        elif isinstance(value, (dict, list)):
+            files[f'{key}.json'] = value
+
+    index = {
+        'generated': data.get('generated'),
+        'files': {rel: _write_section(out_dir, rel, obj, previous) for rel, obj in files.items()},
     }
+    for rel in set(previous) - set(index['files']):
+        for f in (out_dir / rel).parent.glob(Path(rel).name + '*'):
+            f.unlink()
+    _write_section(out_dir, 'index.json', index, {})
+    return index
 
 
 def main():
+    global XLSX_CACHE_DIR, SECTION_CACHE_DIR, XLSX_PROJECTED, STAGE_WORKERS, PROCESS_STAGES
     parser = argparse.ArgumentParser(description='Generate Copilot Adoption Dashboard JSON')
     parser.add_argument('--input', '-i', type=Path, help='Path to PR xlsx file (default: latest in exports/)')
     parser.add_argument('--sheet', '-s', type=str, help='PR sheet name (default: auto-detect)')
     parser.add_argument('--copilot', '-c', type=Path, help='Path to xlsx with Copilot_All sheet (default: auto-detect)')
+    parser.add_argument('--incremental', action='store_true',
+                        help=f'Only ingest weeks newer than the state in {STATE_DIR.relative_to(PROJECT_ROOT)} (seeded on first run)')
+    parser.add_argument('--chunksize', type=int,
+                        help='Stream a CSV --input in chunks of this many rows (memory scales with tickets, not PRs)')
+    parser.add_argument('--projected', action='store_true',
+                        help='Stream workbooks read-only and keep only the columns the pipeline uses')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Parse workbooks and compute every section directly instead of through '
+                             f'{XLSX_CACHE_DIR.relative_to(PROJECT_ROOT)}')
+    parser.add_argument('--stage-workers', type=int,
+                        help=f'Threads for pipeline stages that can overlap (default: {STAGE_WORKERS}; '
+                             f'1 runs them one at a time)')
+    parser.add_argument('--sections', nargs='+', metavar='FIELD',
+                        choices=[f for f, _, _ in PAYLOAD_FIELDS if f not in ('generated', '_userIdMap')],
+                        help=f'Recompute only these top-level fields (e.g. projects perUser) and patch them into '
+                             f'the existing {JSON_OUTPUT.name}; the other sections are left as they are')
+    parser.add_argument('--sectioned', action='store_true',
+                        help=f'Also write per-section + per-developer files with gzip/brotli siblings '
+                             f'to {SECTIONS_DIR.relative_to(PROJECT_ROOT)}')
+    parser.add_argument('--report', action='store_true',
+                        help=f'Write per-stage timings, memory and row counts to {RUN_REPORT_OUTPUT.relative_to(PROJECT_ROOT)}')
+    parser.add_argument('--report-memory', action='store_true',
+                        help='Report per-stage allocation peaks too (tracemalloc; slows the run)')
+    parser.add_argument('--prometheus', type=Path,
+                        help='Report, and also write the stage metrics as a node_exporter textfile (*.prom)')
     args = parser.parse_args()
 
     if not HAS_PANDAS:
         print("pandas not available. Skipping refresh.")
         return
 
+    if args.no_cache:
+        XLSX_CACHE_DIR = SECTION_CACHE_DIR = None
+    XLSX_PROJECTED = args.projected
+    PROCESS_STAGES = WORKBOOK_STAGES
+    if args.stage_workers:
+        STAGE_WORKERS = args.stage_workers
+
     if args.input:
         path = Path(args.input)
         if not path.exists():
@@ -1239,9 +3116,10 @@ def main():
             print(str(e))
             sys.exit(1)
 
-    xl = pd.ExcelFile(path)
-    pull_sheet = args.sheet or find_pull_sheet(xl)
-    if not pull_sheet:
+    # CSV exports (load_prs reads them directly) have no sheets to pick from.
+    is_csv = path.suffix.lower() == '.csv'
+    pull_sheet = args.sheet or (None if is_csv else workbook_info(path)['pullSheet'])
+    if not pull_sheet and not is_csv:
         print("Error: No Pull sheet found. Use --sheet to specify.")
         sys.exit(1)
 
@@ -1257,59 +3135,110 @@ def main():
         else:
             print("Warning: No Copilot/AI telemetry data found. Dashboard will show team metrics without copilot overlay.")
 
-    data = build_dashboard_data(path, pull_sheet, copilot_path)
+    def finish_report(status):
+        if args.report:
+            finish_run_report(RUN_REPORT_OUTPUT, args.prometheus, status=status, input=path,
+                              copilot=copilot_path, incremental=args.incremental)
+            print(f"Run report written to: {RUN_REPORT_OUTPUT}"
+                  + (f" (+ {args.prometheus})" if args.prometheus else ''))
+
+    def refuse_noop(reason):
+        finish_report('unchanged')
+        print("=" * 72)
+        print("ERROR: NO NEW DATA INGESTED — output not written.")
+        print(f"  Input export:      {path.name}")
+        print(f"  Existing output:   {JSON_OUTPUT}")
+        for line in reason:
+            print(f"  {line}")
+        print("  Add a fresh export to pipeline/data/exports/ (or pass --input)")
+        print("  and re-run.")
+        print("=" * 72)
+        sys.exit(1)
+
+    def write_sectioned(data=None):
+        # The section files are content-hashed and left alone when unchanged,
+        # so the no-op guard doesn't apply to them: a run that doesn't rewrite
+        # the JSON still produces them, from the payload the file holds.
+        if data is None:
+            data = json.loads(JSON_OUTPUT.read_text(encoding='utf-8'))
+        files = run_stage('write_sectioned_payload', write_sectioned_payload, data)['files']
+        first_paint = sum(e.get('gzBytes', e['bytes']) for rel, e in files.items()
+                          if rel in ('meta.json', 'summary.json', 'weekly.json'))
+        print(f"Sectioned payload ({len(files)} files{'' if HAS_BROTLI else ', no brotli'}) written to: "
+              f"{SECTIONS_DIR}  [meta+summary+weekly: {first_paint / 1024:.1f} KB gzipped]")
+
+    if args.sections and not JSON_OUTPUT.exists():
+        print(f"Error: --sections patches {JSON_OUTPUT}, which does not exist yet. Run a full refresh first.")
+        sys.exit(1)
+
+    args.report = args.report or args.report_memory or args.prometheus is not None
+    if args.report:
+        start_run_report(trace_memory=args.report_memory)
+    state_dir = STATE_DIR if args.incremental else None
+    # Guard, before any workbook is parsed: the exports, state, code and
+    # constants are those of the run that wrote the current JSON (skipped
+    # with --no-cache, which always recomputes).
+    fingerprint = dashboard_fingerprint(path, pull_sheet, copilot_path, state_dir, args.chunksize)
+    if SECTION_CACHE_DIR is not None and payload_unchanged(JSON_OUTPUT, fingerprint):
+        if args.sectioned:
+            write_sectioned()
+        refuse_noop(["The inputs, pipeline code and settings are unchanged since the",
+                     "run that wrote the existing file, so the dashboard would show",
+                     "nothing new (nothing was parsed)."])
+    if args.sections:
+        # Patch in place: every other field keeps its current value and position.
+        # The fields built from constants alone (bucketing, baselineEnd, ...)
+        # are always refreshed, so they describe the settings the patched
+        # sections were computed with.
+        fields = [f for f, deps, _ in PAYLOAD_FIELDS
+                  if not deps or f in args.sections or (f == '_userIdMap' and 'perUser' in args.sections)]
+        data = json.loads(JSON_OUTPUT.read_text(encoding='utf-8'))
+        data.update(build_dashboard_sections(fields, path, pull_sheet, copilot_path, state_dir, args.chunksize))
+        print(f"Recomputed {', '.join(args.sections)}; other sections kept from {JSON_OUTPUT.name}")
+    else:
+        data = build_dashboard_data(path, pull_sheet, copilot_path, state_dir, args.chunksize)
 
     # Pull the standalone alias->UUID map out of the payload before the public write.
     # (The UUID is still shipped inline on each per_user record for the individual view;
     # this separate map is written to the non-served drill-down file below.)
     user_id_map = data.pop('_userIdMap', None)
 
-    data = _sanitize_for_json(data)
-    json_str = json.dumps(data, default=serialize, indent=2)
-
     # Guard: refuse a silent no-op refresh. If the output matches the existing
     # JSON except for the "generated" timestamp, the input contained no new data
     # and rewriting the file would only make the dashboard *look* refreshed.
-    def strip_generated(text: str) -> str:
-        return re.sub(r'"generated": "[^"]*"', '"generated": ""', text, count=1)
+    written = run_stage('write_dashboard_json', write_dashboard_json, data, JSON_OUTPUT)
+    if written and not args.sections:
+        # Only a run that wrote the file owns it; a patched file is not the
+        # payload of any whole run.
+        record_fingerprint(JSON_OUTPUT, fingerprint)
+    if written:
+        print(f"JSON written to: {JSON_OUTPUT}")
+    if args.sectioned:
+        write_sectioned(data if written else None)
+    if not written:
+        refuse_noop([f"The recomputed {', '.join(args.sections)} match the existing file"
+                     if args.sections else "The regenerated JSON is identical to the existing file",
+                     "(only the 'generated' timestamp would change), so the dashboard",
+                     "would show nothing new."])
 
-    if JSON_OUTPUT.exists() and strip_generated(JSON_OUTPUT.read_text(encoding='utf-8')) == strip_generated(json_str):
+    # Guard: warn when the freshest activity in the input is already old.
+    age_days = data_age_days(data)
+    if age_days is not None and age_days > 7:
+        range_end_str = str(data['dataRange']).split(' to ')[-1]
         print("=" * 72)
-        print("ERROR: NO NEW DATA INGESTED — output not written.")
-        print(f"  Input export:      {path.name}")
-        print(f"  Existing output:   {JSON_OUTPUT}")
-        print("  The regenerated JSON is identical to the existing file (only the")
-        print("  'generated' timestamp would change), so the dashboard would show")
-        print("  nothing new. Add a fresh export to pipeline/data/exports/ (or pass")
-        print("  --input) and re-run.")
+        print(f"WARNING: STALE SOURCE DATA — newest activity in {path.name} is")
+        print(f"  {range_end_str} ({age_days} days old). The dashboard was rewritten but its")
+        print("  charts still end at that date. Export a newer xlsx to extend them.")
         print("=" * 72)
-        sys.exit(1)
-
-    JSON_OUTPUT.parent.mkdir(parents=True, exist_ok=True)
-    JSON_OUTPUT.write_text(json_str, encoding='utf-8')
-    print(f"JSON written to: {JSON_OUTPUT}")
-
-    # Guard: warn when the freshest activity in the input is already old.
-    range_end_str = str(data.get('dataRange', '')).split(' to ')[-1]
-    try:
-        range_end = datetime.strptime(range_end_str, '%Y-%m-%d').date()
-        age_days = (date.today() - range_end).days
-        if age_days > 7:
-            print("=" * 72)
-            print(f"WARNING: STALE SOURCE DATA — newest activity in {path.name} is")
-            print(f"  {range_end_str} ({age_days} days old). The dashboard was rewritten but its")
-            print("  charts still end at that date. Export a newer xlsx to extend them.")
-            print("=" * 72)
-    except ValueError:
-        pass
 
     if user_id_map:
         OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
         USER_ID_MAP_OUTPUT.write_text(json.dumps(user_id_map, indent=2), encoding='utf-8')
         print(f"User-ID drill-down map ({len(user_id_map)} devs, NOT served) written to: {USER_ID_MAP_OUTPUT}")
+    finish_report('written')
 
     print(f"\nSize × complexity bucketing (data-driven cuts):")
-    print(f"  Size cut: {SIZE_CUT} lines  | Files cut: {FILES_CUT} files")
+    print(f"  Size cuts: {', '.join(map(str, SIZE_CUTS))} lines  | Files cuts: {', '.join(map(str, FILES_CUTS))} files")
     sc_totals = {}
     for b in data['sizeComplexity']:
         sc_totals[b['label']] = b['post_tickets'] + b['baseline_tickets']
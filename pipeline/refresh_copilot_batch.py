@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Copilot Adoption Dashboard - Multi-Client Batch Refresh
+
+Runs refresh_copilot.build_dashboard_data for several client teams in a
+process pool, so a nightly refresh of N clients takes about as long as the
+slowest one rather than the sum. One client failing (bad export, missing
+sheet, crash) never stops the others; every outcome lands in one combined
+run summary.
+
+The manifest is JSON, either a list or {"clients": [...]}, one entry per client:
+
+    {"clients": [
+        {"client": "ecs",
+         "input": "data/exports/ecs/20260805 PullRequests and AI.xlsx",
+         "copilot": "data/exports/ecs/20260805 PullRequests and AI.xlsx",
+         "output": "../public/data/copilot-dashboard-data.json"},
+        {"client": "acme", "input": "acme/prs.csv", "chunksize": 500000,
+         "output": "acme/copilot-dashboard-data.json"}
+    ]}
+
+``copilot``, ``sheet`` and ``chunksize`` are optional; relative paths resolve
+against the manifest's directory. There is no telemetry auto-detection in batch
+mode — the exports folder is shared, so a guess could overlay another client's
+usage. Each client's console output goes to pipeline/output/batch/<client>.log.
+
+Usage:
+    python pipeline/refresh_copilot_batch.py clients.json
+    python pipeline/refresh_copilot_batch.py clients.json --workers 4 --incremental
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import refresh_copilot as rc
+
+BATCH_DIR = rc.OUTPUT_DIR / 'batch'
+BATCH_SUMMARY = rc.OUTPUT_DIR / 'batch-summary.json'
+
+
+def client_slug(client) -> str:
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', str(client)).strip('_') or 'client'
+
+
+def load_manifest(path):
+    """Manifest entries with paths resolved; exits on a malformed manifest.
+
+    Missing export files are not checked here — that is a per-client failure,
+    reported in the summary like any other.
+    """
+    path = Path(path)
+    try:
+        raw = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot read manifest {path}: {e}")
+        sys.exit(1)
+    entries = raw.get('clients') if isinstance(raw, dict) else raw
+    if not isinstance(entries, list) or not entries:
+        print(f"Error: manifest {path} lists no clients")
+        sys.exit(1)
+
+    base = path.resolve().parent
+    clients, seen_slugs, seen_outputs = [], set(), set()
+    for i, entry in enumerate(entries):
+        missing = [k for k in ('client', 'input', 'output') if not entry.get(k)]
+        if missing:
+            print(f"Error: manifest entry {i} is missing {', '.join(missing)}")
+            sys.exit(1)
+        client = {
+            'client': str(entry['client']),
+            'input': base / entry['input'],
+            'copilot': base / entry['copilot'] if entry.get('copilot') else None,
+            'output': (base / entry['output']).resolve(),
+            'sheet': entry.get('sheet'),
+            'chunksize': entry.get('chunksize'),
+        }
+        # Slugs name the log, state and drill-down paths; outputs must not collide either.
+        slug = client_slug(client['client'])
+        if slug in seen_slugs or client['output'] in seen_outputs:
+            print(f"Error: manifest entry {i} ({client['client']}) duplicates another client or output path")
+            sys.exit(1)
+        seen_slugs.add(slug)
+        seen_outputs.add(client['output'])
+        clients.append(client)
+    return clients
+
+
+def refresh_client(client, incremental=False, projected=False, use_cache=True, report=False):
+    """Build and write one client's dashboard; runs in a pool worker.
+
+    Returns the client's summary record. Exceptions are caught and reported
+    as status 'failed' so they never reach the pool.
+    """
+    slug = client_slug(client['client'])
+    BATCH_DIR.mkdir(parents=True, exist_ok=True)
+    log_path = BATCH_DIR / f'{slug}.log'
+    record = {
+        'client': client['client'],
+        'input': str(client['input']),
+        'copilot': str(client['copilot']) if client['copilot'] else None,
+        'output': str(client['output']),
+        'log': str(log_path),
+    }
+    rc.XLSX_PROJECTED = projected
+    rc.PROCESS_STAGES = rc.WORKBOOK_STAGES
+    if not use_cache:
+        rc.XLSX_CACHE_DIR = rc.SECTION_CACHE_DIR = None
+
+    t0 = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            record.update(_refresh(client, slug, incremental, report))
+        except Exception as e:
+            traceback.print_exc()
+            record.update(status='failed', error=f'{type(e).__name__}: {e}')
+    record['seconds'] = round(time.perf_counter() - t0, 2)
+    return record
+
+
+def _refresh(client, slug, incremental, report=False):
+    path, copilot_path, output = client['input'], client['copilot'], client['output']
+    if not path.exists():
+        raise FileNotFoundError(f"PR export not found: {path}")
+    if copilot_path and not copilot_path.exists():
+        raise FileNotFoundError(f"Copilot export not found: {copilot_path}")
+    is_csv = path.suffix.lower() == '.csv'
+    pull_sheet = client['sheet'] or (None if is_csv else rc.workbook_info(path)['pullSheet'])
+    if not pull_sheet and not is_csv:
+        raise ValueError(f"No Pull sheet found in {path.name}; set 'sheet' in the manifest")
+
+    state_dir = rc.STATE_DIR / slug if incremental else None
+    if report:
+        rc.start_run_report()
+    # Same no-op guards as refresh_copilot.py: a run whose fingerprint wrote the
+    # current output parses nothing (unless caching is off), and an identical
+    # payload is not rewritten.
+    fingerprint = rc.dashboard_fingerprint(path, pull_sheet, copilot_path, state_dir, client['chunksize'])
+    unchanged = rc.SECTION_CACHE_DIR is not None and rc.payload_unchanged(output, fingerprint)
+    if unchanged:
+        data = json.loads(output.read_text(encoding='utf-8'))
+    else:
+        data = rc.build_dashboard_data(path, pull_sheet, copilot_path, state_dir, client['chunksize'])
+    user_id_map = data.pop('_userIdMap', None)
+
+    summary = data.get('summary', {})
+    result = rc._sanitize_for_json({
+        'dataRange': data.get('dataRange'),
+        'staleDays': rc.data_age_days(data),
+        'totalTickets': summary.get('total_tickets'),
+        'teamProductivity': summary.get('team_productivity'),
+        'productivityVsBaseline': summary.get('productivity_vs_baseline'),
+        'copilotUsers': (data.get('copilotAdoption') or {}).get('totalCopilotUsers'),
+    })
+    written = False
+    if not unchanged:
+        written = rc.run_stage('write_dashboard_json', rc.write_dashboard_json, data, output)
+        if written:
+            rc.record_fingerprint(output, fingerprint)
+    if report:
+        report_path = BATCH_DIR / slug / rc.RUN_REPORT_OUTPUT.name
+        rc.finish_run_report(report_path, status='written' if written else 'unchanged',
+                             client=client['client'], input=path, copilot=copilot_path)
+        result['runReport'] = str(report_path)
+    if not written:
+        print(f"No new data: {output} already holds this payload; not written.")
+        return dict(result, status='unchanged')
+
+    print(f"JSON written to: {output}")
+    if user_id_map:
+        map_path = BATCH_DIR / slug / rc.USER_ID_MAP_OUTPUT.name
+        map_path.parent.mkdir(parents=True, exist_ok=True)
+        map_path.write_text(json.dumps(user_id_map, indent=2), encoding='utf-8')
+        print(f"User-ID drill-down map ({len(user_id_map)} devs, NOT served) written to: {map_path}")
+        result['userIdMap'] = str(map_path)
+    return dict(result, status='written')
+
+
+def _refresh_isolated(client, options):
+    """refresh_client in a process of its own, which exits as soon as the client is done."""
+    with rc._process_pool(1) as pool:
+        return pool.submit(refresh_client, client, **options).result()
+
+
+def run_batch(clients, workers, **options):
+    """Refresh every client, ``workers`` at a time; records in manifest order."""
+    records = [None] * len(clients)
+    # One fresh process per client: memory from a large client goes back to the
+    # OS as soon as it finishes, and module globals never leak between clients.
+    # The threads only start those processes and wait on them.
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_refresh_isolated, c, options) for c in clients]
+        for i, (client, future) in enumerate(zip(clients, futures)):
+            try:
+                records[i] = future.result()
+            except Exception as e:
+                # The worker died outright (killed, out of memory) before it could report.
+                records[i] = {'client': client['client'], 'output': str(client['output']),
+                              'status': 'failed', 'error': f'{type(e).__name__}: {e}'}
+            r = records[i]
+            detail = r.get('error') or r.get('dataRange') or ''
+            print(f"  {r['client']:<20} {r['status']:<10} {r.get('seconds', 0):>7.1f}s  {detail}")
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh Copilot dashboards for several clients in parallel')
+    parser.add_argument('manifest', type=Path, help='JSON manifest of client, input, copilot, output')
+    parser.add_argument('--workers', '-j', type=int,
+                        help='Concurrent client refreshes (default: min(clients, CPUs))')
+    parser.add_argument('--summary', type=Path, default=BATCH_SUMMARY,
+                        help=f'Combined run summary (default: {BATCH_SUMMARY.relative_to(rc.PROJECT_ROOT)})')
+    parser.add_argument('--incremental', action='store_true',
+                        help=f'Per-client incremental state under {rc.STATE_DIR.relative_to(rc.PROJECT_ROOT)}/<client>')
+    parser.add_argument('--projected', action='store_true',
+                        help='Stream workbooks read-only and keep only the columns the pipeline uses')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Parse workbooks and compute every section directly, bypassing the sheet and section caches')
+    parser.add_argument('--report', action='store_true',
+                        help=f'Write a per-stage run report per client to {BATCH_DIR.relative_to(rc.PROJECT_ROOT)}/<client>/')
+    args = parser.parse_args()
+
+    if not rc.HAS_PANDAS:
+        print("pandas not available. Skipping refresh.")
+        return
+
+    clients = load_manifest(args.manifest)
+    workers = max(1, min(args.workers or os.cpu_count() or 1, len(clients)))
+    print(f"Refreshing {len(clients)} clients on {workers} workers")
+
+    started = datetime.now()
+    t0 = time.perf_counter()
+    records = run_batch(clients, workers, incremental=args.incremental,
+                        projected=args.projected, use_cache=not args.no_cache, report=args.report)
+    elapsed = time.perf_counter() - t0
+
+    counts = {s: sum(r['status'] == s for r in records) for s in ('written', 'unchanged', 'failed')}
+    summary = {
+        'started': started.strftime('%Y-%m-%d %H:%M:%S'),
+        'seconds': round(elapsed, 2),
+        # Wall time if the clients had run one after another.
+        'serialSeconds': round(sum(r.get('seconds', 0) for r in records), 2),
+        'workers': workers,
+        'manifest': str(args.manifest.resolve()),
+        'counts': counts,
+        'clients': records,
+    }
+    args.summary.parent.mkdir(parents=True, exist_ok=True)
+    args.summary.write_text(json.dumps(summary, indent=2), encoding='utf-8')
+
+    print(f"\n{counts['written']} written, {counts['unchanged']} unchanged (no new data), "
+          f"{counts['failed']} failed in {elapsed:.1f}s ({summary['serialSeconds']:.1f}s serial)")
+    stale = [r['client'] for r in records if (r.get('staleDays') or 0) > 7]
+    if stale:
+        print(f"WARNING: stale source data (newest activity > 7 days old) for: {', '.join(stale)}")
+    print(f"Run summary written to: {args.summary}")
+    if counts['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()